@@ -5,15 +5,20 @@
 # Pat O'Brien, August 19, 2018
 
 from __future__ import with_statement
+import bisect
 import datetime
 import time
 import calendar
 import json
+import operator
 import os
 import os.path
 import syslog
+import subprocess
 import sys
 import locale
+import threading
+import urllib2
 
 import weewx
 import weecfg
@@ -28,10 +33,43 @@ import weeplot.genplot
 import weeplot.utilities
 
 from collections import OrderedDict
+try:
+    from itertools import izip
+except ImportError:
+    # Python 3: zip is already lazy
+    izip = zip
+
+# Plain dict preserves insertion order on Python 3.7+ and is cheaper to build
+# than OrderedDict; keep OrderedDict on older interpreters where the JSON
+# output would otherwise lose the configured ordering.
+if sys.version_info >= (3, 7):
+    _ODict = dict
+else:
+    _ODict = OrderedDict
+
+# String types for isinstance checks that must work on Python 2 and 3
+_STR_TYPES = (str, unicode) if sys.version_info[0] < 3 else (str,)
 
 from weewx.cheetahgenerator import SearchList
 from weewx.tags import TimespanBinder
 from weeutil.weeutil import to_bool, TimeSpan, to_int, archiveDaySpan, archiveWeekSpan, archiveMonthSpan, archiveYearSpan, startOfDay, timestamp_to_string, option_as_list
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_dumps_bytes( obj ):
+    """Serialize to UTF-8 JSON bytes, through orjson when it is installed.
+    orjson is optional - it is a C encoder several times faster than the
+    stdlib on the multi-megabyte chart payloads."""
+    if orjson is not None:
+        try:
+            return orjson.dumps( obj )
+        except TypeError:
+            # orjson refuses dict subclasses such as ConfigObj sections
+            pass
+    return json.dumps( obj ).encode( "utf-8" )
+
 try:
     from weeutil.config import search_up
 except:
@@ -43,8 +81,11 @@ if weewx.__version__ < "3.9":
     raise weewx.UnsupportedFeature("weewx 3.9 and newer is required, found %s" % weewx.__version__)   
     
 # This helps with locale. https://stackoverflow.com/a/40346898/1177153
-reload(sys)
-sys.setdefaultencoding("utf-8")
+# Only reload when the encoding actually needs changing - reloading sys is
+# expensive and weewx's report engine can re-import skin extensions.
+if sys.getdefaultencoding() != "utf-8":
+    reload(sys)
+    sys.setdefaultencoding("utf-8")
 
 def logmsg(level, msg):
     syslog.syslog(level, 'Belchertown Extension: %s' % msg)
@@ -62,10 +103,471 @@ def logerr(msg):
 VERSION = "1.0.1"
 loginf("version %s" % VERSION)
 
+def _extract_forecast_fields( data ):
+    """Pull out the handful of DarkSky fields the skin actually uses.
+
+    The full forecast document is large; keeping just these strings lets the
+    parse tree be freed right away and keeps the in-memory cache small.
+    """
+    return { "summary": data["currently"]["summary"],
+             "icon": data["currently"]["icon"],
+             "visibility": data["currently"]["visibility"],
+             "units": data["flags"]["units"] }
+
+def _extract_eq_fields( eqdata ):
+    # Same idea for the USGS GeoJSON: only the first feature is ever shown.
+    properties = eqdata["features"][0]["properties"]
+    coordinates = eqdata["features"][0]["geometry"]["coordinates"]
+    return { "time": properties["time"],
+             "url": properties["url"],
+             "place": properties["place"],
+             "mag": properties["mag"],
+             "lat": coordinates[0],
+             "lon": coordinates[1] }
+
+def _round_none_list( values, places ):
+    """Round a whole vector of values, permitting None entries. A single list
+    comprehension with round bound locally, instead of a method call per
+    sample."""
+    _round = round
+    return [ _round( v, places ) if v is not None else None for v in values ]
+
+def _atomic_write( filename, data ):
+    """Write data to a temp file and rename it into place, so a concurrent
+    reader (an overlapping report run, or the webserver) never observes a
+    half-written file. The rename is atomic on POSIX filesystems."""
+    tmp_filename = filename + ".tmp"
+    with open( tmp_filename, 'wb' ) as tmp_file:
+        tmp_file.write( data )
+    os.rename( tmp_filename, filename )
+
+def _download_worker( url, headers, result ):
+    # Runs on a worker thread: stash the payload or the error for the caller.
+    try:
+        req = urllib2.Request( url, None, headers )
+        response = urllib2.urlopen( req )
+        result["data"] = response.read()
+        response.close()
+    except Exception as error:
+        result["error"] = error
+
+def _start_download( url, headers ):
+    """Kick off a download on a background thread.
+
+    The forecast and earthquake fetches are independent HTTP round-trips, so
+    starting both before waiting on either means the total wall time is the
+    slower of the two instead of their sum. Returns ( thread, result ); join
+    the thread, then read result["data"] or result["error"].
+    """
+    result = {}
+    thread = threading.Thread( target=_download_worker, args=( url, headers, result ) )
+    thread.daemon = True
+    thread.start()
+    return thread, result
+
+# SQL that differs per database driver, built once at import time. The driver
+# never changes for the life of a weewx run, so there is no reason to rebuild
+# these query strings on every report cycle. The MySQL strings keep their %%
+# escapes because MySQLdb runs its own format pass over the query text.
+_SQL_TEMPLATES = {
+    "weedb.mysql": {
+        "year_rainiest_month": 'SELECT FROM_UNIXTIME( dateTime, "%%m" ) AS month, ROUND( SUM( sum ), 2 ) AS total FROM archive_day_rain WHERE year( FROM_UNIXTIME( dateTime ) ) = ? GROUP BY month ORDER BY total DESC LIMIT 1;',
+        "at_rainiest_month": 'SELECT FROM_UNIXTIME( dateTime, "%%m" ) AS month, FROM_UNIXTIME( dateTime, "%%Y" ) AS year, ROUND( SUM( sum ), 2 ) AS total FROM archive_day_rain GROUP BY month, year ORDER BY total DESC LIMIT 1;',
+        # The all stats from http://www.weewx.com/docs/customizing.htm doesn't seem to calculate "Total Rainfall for" all time stat correctly.
+        "at_rain_highest_year": 'SELECT FROM_UNIXTIME( dateTime, "%%Y" ) AS year, ROUND( SUM( sum ), 2 ) AS total FROM archive_day_rain GROUP BY year ORDER BY total DESC LIMIT 1;',
+    },
+}
+
+# The windRose beaufort groups per wind speed unit: the upper bounds of the
+# first 7 groups (bisect_right against these gives the group index in one C
+# call) and the matching legend ranges. The "2" unit variants share the plain
+# unit's entry. https://en.wikipedia.org/wiki/Beaufort_scale
+_WINDROSE_SPEC = {
+    "mile_per_hour":    ( ( 1, 4, 8, 13, 19, 25 ),
+                          ( "< 1", "1-3", "4-7", "8-12", "13-18", "19-24", "25+" ) ),
+    "km_per_hour":      ( ( 2, 6, 12, 20, 29, 39 ),
+                          ( "< 2", "2-5", "6-11", "12-19", "20-28", "29-38", "39+" ) ),
+    "meter_per_second": ( ( 0.5, 1.6, 3.4, 5.6, 8, 10.8 ),
+                          ( "< 0.5", "0.5-1.5", "1.6-3.3", "3.4-5.5", "5.5-7.9", "8-10.7", "10.8+" ) ),
+    "knot":             ( ( 1, 4, 7, 11, 17, 22 ),
+                          ( "< 1", "1-3", "4-6", "7-10", "11-16", "17-21", "22+" ) ),
+}
+
+# The 16 compass points in order, 22.5 degrees apart starting at north.
+_CARDINAL = ( "N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+              "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW" )
+
+def _overlay_leaves( parent_options, section ):
+    """Merge a section's scalars over its parent's already-accumulated
+    options. Equivalent to weeutil.weeutil.accumulateLeaves on the section,
+    but without re-walking every ancestor for every plot and line."""
+    merged = configobj.ConfigObj()
+    merged.update( parent_options )
+    for scalar in section.scalars:
+        merged[scalar] = section[scalar]
+    return merged
+
+# The generator's parsed graphs.conf, reused until the file changes so the
+# ConfigObj tokenizer doesn't rerun on every report cycle.
+_GEN_CHART_CACHE = {"path": None, "mtime": 0, "obj": None}
+
+# Chart options that are integers unless they hold a keyword (e.g. the
+# time_length keywords like "today"). Coerced once at config load instead of
+# over and over in the chart loops.
+_PLOT_INT_KEYS = ( 'time_length', 'time_ago', 'gapsize', 'aggregate_interval', 'yaxis_min', 'yaxis_max' )
+
+def _coerce_chart_ints( section ):
+    """Walk a parsed graphs.conf once and convert the known integer options
+    from ConfigObj strings, leaving keyword values alone."""
+    for key in _PLOT_INT_KEYS:
+        value = section.get( key )
+        if isinstance( value, _STR_TYPES ) and value.lstrip("-").isdigit():
+            section[key] = int( value )
+    for subsection in section.sections:
+        _coerce_chart_ints( section[subsection] )
+
+# Unit conversion callables keyed (from_unit, to_unit), so hot vector
+# conversions skip the per-call lookups inside Converter.convert.
+_CONV_FUNC_CACHE = {}
+
+def _get_conv_func( from_unit, to_unit ):
+    key = ( from_unit, to_unit )
+    func = _CONV_FUNC_CACHE.get( key )
+    if func is None:
+        func = _CONV_FUNC_CACHE[key] = weewx.units.conversionDict[from_unit][to_unit]
+    return func
+
+# Aggregates that can be answered straight from the weewx daily summary
+# tables, and the column that holds each one. avg is left out because the
+# daily tables store it as a weighted sum.
+_DAY_AGG_COLS = { "sum": "sum", "min": "min", "max": "max", "count": "count" }
+
+# Map DarkSky's reported unit system to the visibility label the skin shows.
+_VIS_UNITS = { "us": "miles", "uk2": "miles", "si": "km", "ca": "km" }
+
+# Constant request headers and social-share HTML, built once at import time
+# instead of on every render.
+_UA = 'Mozilla/5.0 (Macintosh; U; Intel Mac OS X 10_6_4; en-US) AppleWebKit/534.3 (KHTML, like Gecko) Chrome/6.0.472.63 Safari/534.3'
+_HEADERS = { 'User-Agent' : _UA }
+
+_FB_HTML_TMPL = """
+                <div id="fb-root"></div>
+                <script>(function(d, s, id) {
+                  var js, fjs = d.getElementsByTagName(s)[0];
+                  if (d.getElementById(id)) return;
+                  js = d.createElement(s); js.id = id;
+                  js.src = "//connect.facebook.net/en_US/sdk.js#xfbml=1&version=v2.5";
+                  fjs.parentNode.insertBefore(js, fjs);
+                }(document, 'script', 'facebook-jssdk'));</script>
+                <div class="fb-like" data-href="%s" data-width="500px" data-layout="button_count" data-action="like" data-show-faces="false" data-share="true"></div>
+            """
+
+_TW_HTML_TMPL = """
+                <script>
+                    !function(d,s,id){var js,fjs=d.getElementsByTagName(s)[0],p=/^http:/.test(d.location)?'http':'https';if(!d.getElementById(id)){js=d.createElement(s);js.id=id;js.src=p+'://platform.twitter.com/widgets.js';fjs.parentNode.insertBefore(js,fjs);}}(document, 'script', 'twitter-wjs');
+                </script>
+                <a href="https://twitter.com/share" class="twitter-share-button" data-url="%s" data-text="%s" data-via="%s" data-hashtags="%s">Tweet</a>
+            """
+
+# Row templates for the station observations table, so each row is emitted
+# with one format call instead of a chain of small concatenations. The trend
+# variant appends the pressure arrow span; the raw variant takes prebuilt
+# cell HTML (the rain + rain rate one liner).
+_OBS_ROW_TMPL = "<tr><td class='station-observations-label'>%s</td><td><span class=%s>%s</span><!-- AJAX --></td></tr>"
+_OBS_ROW_TREND_TMPL = "<tr><td class='station-observations-label'>%s</td><td><span class=%s>%s</span><!-- AJAX --> <span class=\"pressure-trend\">%s</span></td></tr>"
+_OBS_ROW_RAW_TMPL = "<tr><td class='station-observations-label'>%s</td><td>%s</td></tr>"
+
+# Serialized JSON keyed on the dict contents. The rounding, unit label and
+# trend dicts are driven by the skin configuration, so after the first render
+# their json.dumps results are cache hits.
+_DUMPS_CACHE = {}
+
+def _cached_dumps( d ):
+    key = tuple( d.items() )
+    try:
+        return _DUMPS_CACHE[key]
+    except KeyError:
+        result = _DUMPS_CACHE[key] = json.dumps( d )
+        return result
+
+# Parsed forecast/earthquake JSON, keyed on the cache file's mtime. WeeWX can
+# generate several reports per archive interval; when the file on disk has not
+# changed there is no reason to re-open and re-parse it.
+# "checked" records the last time the cache file was verified against disk;
+# renders that come in before the stale timer elapses again skip even that
+# stat and serve the fields straight from memory.
+_FORECAST_CACHE = {"mtime": 0, "checked": 0, "data": None}
+_EQ_CACHE = {"mtime": 0, "checked": 0, "data": None}
+
+# Cache for the year/all-time aggregate stats. The daily summary tables only
+# change once per archive interval, so results computed within the interval
+# can be reused by every report template.
+_AGG_CACHE = {"ts": 0, "data": None}
+
+# Cache of the parsed graphs.conf and the structures derived from it, keyed by
+# (path, mtime). The file rarely changes, but get_extension_list runs for every
+# report template, so re-parsing it each time is wasted CPU and disk I/O.
+_CHART_CACHE = {}
+
+def _load_chart_dict(chart_config_path, default_chart_config_path):
+    """Parse graphs.conf (or its example fallback) and build the chart
+    structures the skin needs. Results are cached at module scope keyed by
+    path and mtime, so repeat calls are free until the file changes. A JSON
+    sidecar stamped with the source mtime persists the derived structures, so
+    even a fresh process can skip the ConfigObj parse - json.load is roughly
+    an order of magnitude faster for a typical graphs.conf."""
+
+    # The stat doubles as the existence check, so no separate os.path.exists call
+    try:
+        config_path = chart_config_path
+        config_mtime = os.stat( config_path ).st_mtime
+    except OSError:
+        config_path = default_chart_config_path
+        config_mtime = os.stat( config_path ).st_mtime
+
+    key = ( config_path, config_mtime )
+    if key in _CHART_CACHE:
+        return _CHART_CACHE[key]
+
+    # Try the JSON sidecar before paying for a full ConfigObj parse
+    sidecar_path = config_path + ".cache.json"
+    try:
+        with open( sidecar_path, "r" ) as sidecar_file:
+            sidecar = json.load( sidecar_file, object_pairs_hook=OrderedDict )
+        if sidecar.get("mtime") == config_mtime:
+            _CHART_CACHE.clear()
+            _CHART_CACHE[key] = ( sidecar["charts"], sidecar["chartgroup_titles"], sidecar["graph_page_buttons"] )
+            return _CHART_CACHE[key]
+    except (IOError, ValueError, KeyError):
+        # No sidecar yet, or it's unreadable - fall through and parse
+        pass
+
+    chart_dict = configobj.ConfigObj(config_path, file_error=True)
+
+    # One pass over the chart groups builds the chart lists, the titles for the
+    # graphs page, and the Graphs page button row all together.
+    charts = OrderedDict()
+    chartgroup_titles = OrderedDict()
+    graph_page_buttons_list = []
+    for chartgroup in chart_dict.sections:
+        group_section = chart_dict[chartgroup]
+
+        timespan_chart_list = []
+        for plotname in group_section.sections:
+            if plotname not in timespan_chart_list:
+                timespan_chart_list.append( plotname )
+        charts[chartgroup] = timespan_chart_list
+
+        # Chart titles for use on the graphs page. If no title defined, use the chartgroup name
+        if "title" in group_section:
+            chartgroup_titles[chartgroup] = group_section["title"]
+        else:
+            chartgroup_titles[chartgroup] = chartgroup
+
+        # Graphs page button row based on the skin extras option and the button_text from graphs.conf
+        if "show_button" in group_section and group_section["show_button"].lower() == "true":
+            if "button_text" in group_section:
+                button_text = group_section["button_text"]
+            else:
+                button_text = chartgroup
+            graph_page_buttons_list.append( '<a href="./?graph=' + chartgroup + '"><button type="button" class="btn btn-primary">' + button_text + '</button></a>' )
+    # Join with a spacer between the buttons
+    graph_page_buttons = " ".join( graph_page_buttons_list )
+
+    # Save the sidecar for the next process. Not being able to write it (for
+    # example a read-only skin dir) is no reason to fail the report.
+    try:
+        with open( sidecar_path, "w" ) as sidecar_file:
+            json.dump( { "mtime": config_mtime,
+                         "charts": charts,
+                         "chartgroup_titles": chartgroup_titles,
+                         "graph_page_buttons": graph_page_buttons }, sidecar_file )
+    except IOError:
+        pass
+
+    # Keep just the latest parse - graphs.conf edits should not grow the cache
+    _CHART_CACHE.clear()
+    _CHART_CACHE[key] = ( charts, chartgroup_titles, graph_page_buttons )
+    return _CHART_CACHE[key]
+
+# Cache of the NOAA report header data keyed by (noaa_dir, mtime). Building it
+# means listing the NOAA folder and stat-ing a file per year and month, which
+# adds up to a lot of syscalls per template render on a long-running station.
+_NOAA_CACHE = {}
+
+def _build_noaa_data(noaa_dir):
+    """Build the list of years, the NOAA report navigation header and the
+    default NOAA file to show on page load. Cached at module scope keyed by
+    the directory's mtime, which changes whenever a NOAA file is added."""
+
+    key = ( noaa_dir, os.stat( noaa_dir ).st_mtime )
+    if key in _NOAA_CACHE:
+        return _NOAA_CACHE[key]
+
+    years = []
+    noaa_header_parts = []
+    default_noaa_file = ""
+    noaa_file_list = os.listdir( noaa_dir )
+    # Membership checks against the listing replace a stat syscall per file below
+    noaa_files = set( noaa_file_list )
+
+    # Generate a list of years based on file name
+    for f in noaa_file_list:
+        filename = f.split(".")[0] # Drop the .txt
+        year = filename.split("-")[1]
+        years.append(year)
+
+    years = sorted( set( years ) )[::-1] # Remove duplicates with set, and sort numerically, then reverse sort with [::-1] oldest year last
+
+    for y in years:
+        # Link to the year file
+        if "NOAA-%s.txt" % y in noaa_files:
+            noaa_header_parts.append( '<a href="?yr=%s" class="noaa_rep_nav"><b>%s</b></a>:' % ( y, y ) )
+        else:
+            noaa_header_parts.append( '<span class="noaa_rep_nav"><b>%s</b></span>:' % y )
+
+        # Loop through all 12 months and find if the file exists.
+        # If the file doesn't exist, just show the month name in the header without a href link.
+        # There is no month 13, but we need to loop to 12, so 13 is where it stops.
+        for i in range(1, 13):
+            month_num = format( i, '02' ) # Pad the number with a 0 since the NOAA files use 2 digit month
+            month_abbr = calendar.month_abbr[ i ]
+            if "NOAA-%s-%s.txt" % ( y, month_num ) in noaa_files:
+                noaa_header_parts.append( ' <a href="?yr=%s&amp;mo=%s" class="noaa_rep_nav"><b>%s</b></a>' % ( y, month_num, month_abbr ) )
+            else:
+                noaa_header_parts.append( ' <span class="noaa_rep_nav"><b>%s</b></span>' % month_abbr )
+
+        # Row build complete, push next row to new line
+        noaa_header_parts.append( "<br>" )
+
+    # Find the current month's NOAA file for the default file to show on JavaScript page load.
+    # The NOAA files are generated as part of this skin, but if for some reason that the month file doesn't exist, use the year file.
+    now = datetime.datetime.now()
+    current_year = str( now.year )
+    current_month = "%02d" % now.month
+    if "NOAA-%s-%s.txt" % ( current_year, current_month ) in noaa_files:
+        default_noaa_file = "NOAA-%s-%s.txt" % ( current_year, current_month )
+    else:
+        default_noaa_file = "NOAA-%s.txt" % current_year
+
+    noaa_header_html = "".join( noaa_header_parts )
+
+    # Keep just the latest listing - a new NOAA file invalidates the old key
+    _NOAA_CACHE.clear()
+    _NOAA_CACHE[key] = ( years, noaa_header_html, default_noaa_file )
+    return _NOAA_CACHE[key]
+
+def _find_rain_streaks(wx_manager, start_epoch=None):
+    """Find the longest run of consecutive days with and without rainfall.
+
+    The streaks are computed inside the database with a single islands-and-gaps
+    window query (SQLite 3.25+, MySQL 8+), so we never pull every daily row
+    into Python. Returns ( (with_days, with_end_ts), (without_days, without_end_ts) ).
+    Falls back to the old Python accumulator on databases without window functions."""
+
+    if start_epoch is not None:
+        where = "WHERE dateTime >= ? "
+        sqlargs = (start_epoch,)
+    else:
+        where = ""
+        sqlargs = ()
+
+    now_gm_ts = calendar.timegm( time.gmtime() )
+
+    try:
+        # Group the daily rows into islands of equal wet/dry state, then take the
+        # longest island per state. The run count is small, so picking the max
+        # per state in Python is cheap.
+        streak_sql = ( 'SELECT wet, COUNT(*) AS run_len, MAX(dateTime) AS end_ts FROM '
+                       '( SELECT dateTime, (sum <> 0) AS wet, '
+                       'ROW_NUMBER() OVER (ORDER BY dateTime) - '
+                       'ROW_NUMBER() OVER (PARTITION BY (sum <> 0) ORDER BY dateTime) AS grp '
+                       'FROM archive_day_rain %s) AS t GROUP BY wet, grp;' % where )
+        # Note the where clause only ever contains a ? placeholder - the value
+        # itself is bound below so the driver can reuse the prepared plan.
+        days_with_rain = ( 0, now_gm_ts )
+        days_without_rain = ( 0, now_gm_ts )
+        for row in wx_manager.genSql( streak_sql, sqlargs ):
+            if row[0]:
+                if row[1] > days_with_rain[0]:
+                    days_with_rain = ( row[1], row[2] )
+            else:
+                if row[1] > days_without_rain[0]:
+                    days_without_rain = ( row[1], row[2] )
+        return days_with_rain, days_without_rain
+    except weedb.DatabaseError:
+        # Window functions need SQLite 3.25+ or MySQL 8+. Fall back to counting in Python.
+        pass
+
+    # Track the best run inline while streaming the rows - O(1) memory instead
+    # of accumulating a dict per day only to scan it again afterwards.
+    days_with_rain_total = 0
+    days_without_rain_total = 0
+    days_with_rain = ( 0, now_gm_ts )
+    days_without_rain = ( 0, now_gm_ts )
+    rain_query = wx_manager.genSql( 'SELECT dateTime, ROUND( sum, 2 ) FROM archive_day_rain %s;' % where, sqlargs )
+    for row in rain_query:
+        # Original MySQL way: CASE WHEN sum!=0 THEN @total+1 ELSE 0 END
+        if row[1] != 0:
+            days_with_rain_total += 1
+            if days_with_rain_total > days_with_rain[0]:
+                days_with_rain = ( days_with_rain_total, row[0] )
+            days_without_rain_total = 0
+        else:
+            # Original MySQL way: CASE WHEN sum=0 THEN @total+1 ELSE 0 END
+            days_without_rain_total += 1
+            if days_without_rain_total > days_without_rain[0]:
+                days_without_rain = ( days_without_rain_total, row[0] )
+            days_with_rain_total = 0
+
+    return days_with_rain, days_without_rain
+
 class getData(SearchList):
     def __init__(self, generator):
         SearchList.__init__(self, generator)
 
+        # Setup the converter. These lookups only depend on weewx.conf and
+        # skin.conf, so resolve them once per instance instead of per render.
+        # Get the target unit nickname (something like 'US' or 'METRIC'):
+        target_unit_nickname = generator.config_dict['StdConvert']['target_unit']
+        # Get the target unit: weewx.US, weewx.METRIC, weewx.METRICWX
+        target_unit = weewx.units.unit_constants[target_unit_nickname.upper()]
+        # Bind to the appropriate standard converter units
+        self._std_converter = weewx.units.StdUnitConverters[target_unit]
+
+        string_formats = generator.skin_dict['Units']['StringFormats']
+        # Find the group_name for outTemp and the number of decimals to round to
+        self._outTemp_unit = self._std_converter.group_unit_dict["group_temperature"]
+        self._outTemp_round = string_formats.get(self._outTemp_unit, "%.1f")
+        # Find the group_name for rain and the number of decimals to round to
+        self._rain_unit = self._std_converter.group_unit_dict["group_rain"]
+        self._rain_round = string_formats.get(self._rain_unit, "%.2f")
+
+        # Normalize the station_observations option once. A single entry comes
+        # through ConfigObj as a string, so force it into a tuple either way,
+        # and dedupe while keeping the configured order.
+        station_observations = generator.skin_dict['Extras']['station_observations']
+        if isinstance(station_observations, (list, tuple)) is False:
+            station_observations = station_observations.split()
+        self._station_observations = tuple(_ODict.fromkeys(station_observations))
+
+    def _conv_fmt(self, values, unit, group, fmt):
+        """Convert a list of database values to the site's unit and format each
+        for the locale. Collapses the repeated convert + locale.format blocks."""
+        conv = self.generator.converter.convert
+        lf = locale.format
+        return [ lf("%g", float(fmt % conv((v, unit, group))[0])) for v in values ]
+
+    def _range_fmt(self, query_row, unit, group, fmt):
+        """Convert a daily range row (dateTime, total, min, max) and rebuild the
+        total from the converted values, since the unit may have changed."""
+        conv = self.generator.converter.convert
+        lf = locale.format
+        range_min = fmt % conv((query_row[2], unit, group))[0]
+        range_max = fmt % conv((query_row[3], unit, group))[0]
+        range_total = fmt % ( float(range_max) - float(range_min) )
+        return [ query_row[0], lf("%g", float(range_total)), lf("%g", float(range_min)), lf("%g", float(range_max)) ]
+
     def get_extension_list(self, timespan, db_lookup):
         """
         Build the data needed for the Belchertown skin
@@ -105,9 +607,12 @@ class getData(SearchList):
         # Find the SKIN ROOT
         local_skin_root = os.path.join( self.generator.config_dict['WEEWX_ROOT'], self.generator.skin_dict['SKIN_ROOT'], self.generator.skin_dict['skin'] )
         
-        # Setup UTC offset hours for moment.js in index.html
-        moment_js_stop_struct = time.localtime( time.time() )
-        moment_js_utc_offset = (calendar.timegm(moment_js_stop_struct) - calendar.timegm(time.gmtime(time.mktime(moment_js_stop_struct))))/60
+        # Setup UTC offset hours for moment.js in index.html. The stdlib exposes
+        # the offset directly, saving a round trip through three time conversions.
+        if time.daylight and time.localtime().tm_isdst:
+            moment_js_utc_offset = -time.altzone / 60
+        else:
+            moment_js_utc_offset = -time.timezone / 60
         
         # Highcharts UTC offset is the opposite of normal. Positive values are west, negative values are east of UTC. https://api.highcharts.com/highcharts/time.timezoneOffset
         # Multiplying by -1 will reverse the number sign and keep 0 (not -0). https://stackoverflow.com/a/14053631/1177153
@@ -171,39 +676,7 @@ class getData(SearchList):
             self.generator.skin_dict['SKIN_ROOT'],
             self.generator.skin_dict.get('skin', ''),
             'graphs.conf.example')
-        if os.path.exists( chart_config_path ):
-            chart_dict = configobj.ConfigObj(chart_config_path, file_error=True)
-        else:
-            chart_dict = configobj.ConfigObj(default_chart_config_path, file_error=True)
-        charts = OrderedDict()
-        for chart_timespan in chart_dict.sections:
-            timespan_chart_list = []
-            for plotname in chart_dict[chart_timespan].sections:
-                if plotname not in timespan_chart_list:
-                    timespan_chart_list.append( plotname )
-            charts[chart_timespan] = timespan_chart_list
-        
-        # Create a dict of chart titles for use on the graphs page. If no title defined, use the chartgroup name
-        chartgroup_titles = OrderedDict()
-        for chartgroup in chart_dict.sections:
-            if "title" in chart_dict[chartgroup]:
-                chartgroup_titles[chartgroup] = chart_dict[chartgroup]["title"]
-            else:
-                chartgroup_titles[chartgroup] = chartgroup
-        
-        # Setup the Graphs page button row based on the skin extras option and the button_text from graphs.conf
-        graph_page_buttons = ""
-        graph_page_graphgroup_buttons = []
-        for chartgroup in chart_dict.sections:
-            if "show_button" in chart_dict[chartgroup] and chart_dict[chartgroup]["show_button"].lower() == "true":
-                graph_page_graphgroup_buttons.append(chartgroup)
-        for gg in graph_page_graphgroup_buttons:
-            if "button_text" in chart_dict[gg]:
-                button_text = chart_dict[gg]["button_text"]
-            else:
-                button_text = gg
-            graph_page_buttons += '<a href="./?graph='+gg+'"><button type="button" class="btn btn-primary">' + button_text + '</button></a>'
-            graph_page_buttons += " " # Spacer between the button
+        charts, chartgroup_titles, graph_page_buttons = _load_chart_dict( chart_config_path, default_chart_config_path )
 
         # Set a default radar URL using station's lat/lon. Moved from skin.conf so we can get station lat/lon from weewx.conf. A lot of stations out there with Belchertown 0.1 through 0.7 are showing the visitor's location and not the proper station location because nobody edited the radar_html which did not have lat/lon set previously.
         if self.generator.skin_dict['Extras']['radar_html'] == "":
@@ -220,212 +693,188 @@ class getData(SearchList):
         
         # Find the beginning of the current year
         now = datetime.datetime.now()
-        date_time = '01/01/%s 00:00:00' % now.year
-        pattern = '%m/%d/%Y %H:%M:%S'
-        year_start_epoch = int(time.mktime(time.strptime(date_time, pattern)))
+        year_start_epoch = int( time.mktime( ( now.year, 1, 1, 0, 0, 0, 0, 1, -1 ) ) )
         #_start_ts = startOfInterval(year_start_epoch ,86400) # This is the current calendar year
         
-        # Setup the converter
-        # Get the target unit nickname (something like 'US' or 'METRIC'):
-        target_unit_nickname = self.generator.config_dict['StdConvert']['target_unit']
-        # Get the target unit: weewx.US, weewx.METRIC, weewx.METRICWX
-        target_unit = weewx.units.unit_constants[target_unit_nickname.upper()]
-        # Bind to the appropriate standard converter units
-        converter = weewx.units.StdUnitConverters[target_unit]
-        
-        # Temperature Range Lookups
-        
-        # 1. The database query finds the result based off the total column.
-        # 2. We need to convert the min, max to the site's requested unit.
-        # 3. We need to re-calculate the min/max range because the unit may have changed. 
-
-        year_outTemp_max_range_query = wx_manager.getSql( 'SELECT dateTime, ROUND( (max - min), 1 ) as total, ROUND( min, 1 ) as min, ROUND( max, 1 ) as max FROM archive_day_outTemp WHERE dateTime >= %s AND min IS NOT NULL AND max IS NOT NULL ORDER BY total DESC LIMIT 1;' % year_start_epoch )
-        year_outTemp_min_range_query = wx_manager.getSql( 'SELECT dateTime, ROUND( (max - min), 1 ) as total, ROUND( min, 1 ) as min, ROUND( max, 1 ) as max FROM archive_day_outTemp WHERE dateTime >= %s AND min IS NOT NULL AND max IS NOT NULL ORDER BY total ASC LIMIT 1;' % year_start_epoch )
-        at_outTemp_max_range_query = wx_manager.getSql( 'SELECT dateTime, ROUND( (max - min), 1 ) as total, ROUND( min, 1 ) as min, ROUND( max, 1 ) as max FROM archive_day_outTemp WHERE min IS NOT NULL AND max IS NOT NULL ORDER BY total DESC LIMIT 1;' )
-        at_outTemp_min_range_query = wx_manager.getSql( 'SELECT dateTime, ROUND( (max - min), 1 ) as total, ROUND( min, 1 ) as min, ROUND( max, 1 ) as max FROM archive_day_outTemp WHERE min IS NOT NULL AND max IS NOT NULL ORDER BY total ASC LIMIT 1;' )
-        
-        # Find the group_name for outTemp
-        outTemp_unit = converter.group_unit_dict["group_temperature"]
-        
-        # Find the number of decimals to round to
-        outTemp_round = self.generator.skin_dict['Units']['StringFormats'].get(outTemp_unit, "%.1f")
-
-        # Largest Daily Temperature Range Conversions
-        # Max temperature for this day
-        if year_outTemp_max_range_query is not None:
-            year_outTemp_max_range_max_tuple = (year_outTemp_max_range_query[3], outTemp_unit, 'group_temperature')
-            year_outTemp_max_range_max = outTemp_round % self.generator.converter.convert(year_outTemp_max_range_max_tuple)[0]
-            # Min temperature for this day
-            year_outTemp_max_range_min_tuple = (year_outTemp_max_range_query[2], outTemp_unit, 'group_temperature')
-            year_outTemp_max_range_min = outTemp_round % self.generator.converter.convert(year_outTemp_max_range_min_tuple)[0]
-            # Largest Daily Temperature Range total
-            year_outTemp_max_range_total = outTemp_round % ( float(year_outTemp_max_range_max) - float(year_outTemp_max_range_min) )
-            # Replace the SQL Query output with the converted values
-            year_outTemp_range_max = [ year_outTemp_max_range_query[0], locale.format("%g", float(year_outTemp_max_range_total)), locale.format("%g", float(year_outTemp_max_range_min)), locale.format("%g", float(year_outTemp_max_range_max)) ]
+        # The daily summaries only change once per archive write, so the whole
+        # aggregate block below is cached at module scope and shared by every
+        # report template generated within the same archive interval.
+        if _AGG_CACHE["data"] is not None and time.time() - _AGG_CACHE["ts"] < archive_interval_ms / 1000:
+            agg_stats = _AGG_CACHE["data"]
         else:
-            year_outTemp_range_max = [ calendar.timegm( time.gmtime() ), locale.format("%.1f", 0), locale.format("%.1f", 0), locale.format("%.1f", 0) ]
+            # These never change within one pass through the block, so compute once
+            current_year_str = str( now.year )
+            now_gm_ts = calendar.timegm( time.gmtime() )
+
+            # Temperature Range Lookups
         
-        # Smallest Daily Temperature Range Conversions
-        # Max temperature for this day
-        if year_outTemp_min_range_query is not None:
-            year_outTemp_min_range_max_tuple = (year_outTemp_min_range_query[3], outTemp_unit, 'group_temperature')
-            year_outTemp_min_range_max = outTemp_round % self.generator.converter.convert(year_outTemp_min_range_max_tuple)[0]
-            # Min temperature for this day
-            year_outTemp_min_range_min_tuple = (year_outTemp_min_range_query[2], outTemp_unit, 'group_temperature')
-            year_outTemp_min_range_min = outTemp_round % self.generator.converter.convert(year_outTemp_min_range_min_tuple)[0]
-            # Smallest Daily Temperature Range total
-            year_outTemp_min_range_total = outTemp_round % ( float(year_outTemp_min_range_max) - float(year_outTemp_min_range_min) )
-            # Replace the SQL Query output with the converted values
-            year_outTemp_range_min = [ year_outTemp_min_range_query[0], locale.format("%g", float(year_outTemp_min_range_total)), locale.format("%g", float(year_outTemp_min_range_min)), locale.format("%g", float(year_outTemp_min_range_max)) ]
-        else:
-            year_outTemp_range_min = [ calendar.timegm( time.gmtime() ), locale.format("%.1f", 0), locale.format("%.1f", 0), locale.format("%.1f", 0) ]
+            # 1. The database query finds the result based off the total column.
+            # 2. We need to convert the min, max to the site's requested unit.
+            # 3. We need to re-calculate the min/max range because the unit may have changed. 
+
+            # One round trip for all four range lookups. Each block is a LIMIT 1 subselect
+            # tagged with a literal kind column, glued together with UNION ALL so the
+            # daily summary table is only touched once.
+            outTemp_range_sql = ( 'SELECT * FROM ( SELECT "year_max" AS kind, dateTime, ROUND( (max - min), 1 ) as total, ROUND( min, 1 ) as min, ROUND( max, 1 ) as max FROM archive_day_outTemp WHERE dateTime >= ? AND min IS NOT NULL AND max IS NOT NULL ORDER BY total DESC LIMIT 1 ) AS year_max'
+                                  ' UNION ALL SELECT * FROM ( SELECT "year_min" AS kind, dateTime, ROUND( (max - min), 1 ) as total, ROUND( min, 1 ) as min, ROUND( max, 1 ) as max FROM archive_day_outTemp WHERE dateTime >= ? AND min IS NOT NULL AND max IS NOT NULL ORDER BY total ASC LIMIT 1 ) AS year_min'
+                                  ' UNION ALL SELECT * FROM ( SELECT "at_max" AS kind, dateTime, ROUND( (max - min), 1 ) as total, ROUND( min, 1 ) as min, ROUND( max, 1 ) as max FROM archive_day_outTemp WHERE min IS NOT NULL AND max IS NOT NULL ORDER BY total DESC LIMIT 1 ) AS at_max'
+                                  ' UNION ALL SELECT * FROM ( SELECT "at_min" AS kind, dateTime, ROUND( (max - min), 1 ) as total, ROUND( min, 1 ) as min, ROUND( max, 1 ) as max FROM archive_day_outTemp WHERE min IS NOT NULL AND max IS NOT NULL ORDER BY total ASC LIMIT 1 ) AS at_min;' )
+            outTemp_range_results = {}
+            for row in wx_manager.genSql( outTemp_range_sql, ( year_start_epoch, year_start_epoch ) ):
+                # Unpack each row into a dict keyed by kind, keeping the old column order
+                outTemp_range_results[row[0]] = row[1:]
+            year_outTemp_max_range_query = outTemp_range_results.get( "year_max" )
+            year_outTemp_min_range_query = outTemp_range_results.get( "year_min" )
+            at_outTemp_max_range_query = outTemp_range_results.get( "at_max" )
+            at_outTemp_min_range_query = outTemp_range_results.get( "at_min" )
+        
+            # Unit group and rounding for outTemp, resolved once in __init__
+            outTemp_unit = self._outTemp_unit
+            outTemp_round = self._outTemp_round
+
+            # Largest Daily Temperature Range Conversions
+            # Max temperature for this day
+            if year_outTemp_max_range_query is not None:
+                # Replace the SQL Query output with the converted values
+                year_outTemp_range_max = self._range_fmt( year_outTemp_max_range_query, outTemp_unit, 'group_temperature', outTemp_round )
+            else:
+                year_outTemp_range_max = [ now_gm_ts, locale.format("%.1f", 0), locale.format("%.1f", 0), locale.format("%.1f", 0) ]
         
-        # All Time - Largest Daily Temperature Range Conversions
-        # Max temperature
-        at_outTemp_max_range_max_tuple = (at_outTemp_max_range_query[3], outTemp_unit, 'group_temperature')
-        at_outTemp_max_range_max = outTemp_round % self.generator.converter.convert(at_outTemp_max_range_max_tuple)[0]
-        # Min temperature for this day
-        at_outTemp_max_range_min_tuple = (at_outTemp_max_range_query[2], outTemp_unit, 'group_temperature')
-        at_outTemp_max_range_min = outTemp_round % self.generator.converter.convert(at_outTemp_max_range_min_tuple)[0]
-        # Largest Daily Temperature Range total
-        at_outTemp_max_range_total = outTemp_round % ( float(at_outTemp_max_range_max) - float(at_outTemp_max_range_min) )
-        # Replace the SQL Query output with the converted values
-        at_outTemp_range_max = [ at_outTemp_max_range_query[0], locale.format("%g", float(at_outTemp_max_range_total)), locale.format("%g", float(at_outTemp_max_range_min)), locale.format("%g", float(at_outTemp_max_range_max)) ]
-
-        # All Time - Smallest Daily Temperature Range Conversions
-        # Max temperature for this day
-        at_outTemp_min_range_max_tuple = (at_outTemp_min_range_query[3], outTemp_unit, 'group_temperature')
-        at_outTemp_min_range_max = outTemp_round % self.generator.converter.convert(at_outTemp_min_range_max_tuple)[0]
-        # Min temperature for this day
-        at_outTemp_min_range_min_tuple = (at_outTemp_min_range_query[2], outTemp_unit, 'group_temperature')
-        at_outTemp_min_range_min = outTemp_round % self.generator.converter.convert(at_outTemp_min_range_min_tuple)[0]
-        # Smallest Daily Temperature Range total
-        at_outTemp_min_range_total = outTemp_round % ( float(at_outTemp_min_range_max) - float(at_outTemp_min_range_min) )
-        # Replace the SQL Query output with the converted values
-        at_outTemp_range_min = [ at_outTemp_min_range_query[0], locale.format("%g", float(at_outTemp_min_range_total)), locale.format("%g", float(at_outTemp_min_range_min)), locale.format("%g", float(at_outTemp_min_range_max)) ]
+            # Smallest Daily Temperature Range Conversions
+            # Max temperature for this day
+            if year_outTemp_min_range_query is not None:
+                # Replace the SQL Query output with the converted values
+                year_outTemp_range_min = self._range_fmt( year_outTemp_min_range_query, outTemp_unit, 'group_temperature', outTemp_round )
+            else:
+                year_outTemp_range_min = [ now_gm_ts, locale.format("%.1f", 0), locale.format("%.1f", 0), locale.format("%.1f", 0) ]
         
+            # All Time - Largest Daily Temperature Range Conversions
+            at_outTemp_range_max = self._range_fmt( at_outTemp_max_range_query, outTemp_unit, 'group_temperature', outTemp_round )
+
+            # All Time - Smallest Daily Temperature Range Conversions
+            at_outTemp_range_min = self._range_fmt( at_outTemp_min_range_query, outTemp_unit, 'group_temperature', outTemp_round )
         
-        # Rain lookups
-        # Find the group_name for rain
-        rain_unit = converter.group_unit_dict["group_rain"]
         
-        # Find the number of decimals to round to
-        rain_round = self.generator.skin_dict['Units']['StringFormats'].get(rain_unit, "%.2f")
+            # Rain lookups. Unit group and rounding resolved once in __init__
+            rain_unit = self._rain_unit
+            rain_round = self._rain_round
         
-        # Rainiest Day
-        rainiest_day_query = wx_manager.getSql( 'SELECT dateTime, sum FROM archive_day_rain WHERE dateTime >= %s ORDER BY sum DESC LIMIT 1;' % year_start_epoch )
-        if rainiest_day_query is not None:
-            rainiest_day_tuple = (rainiest_day_query[1], rain_unit, 'group_rain')
-            rainiest_day_converted = rain_round % self.generator.converter.convert(rainiest_day_tuple)[0]
-            rainiest_day = [ rainiest_day_query[0], rainiest_day_converted ]
-        else:
-            rainiest_day = [ calendar.timegm( time.gmtime() ), locale.format("%.2f", 0) ]
+            # A single cheap probe tells us whether there is any rain data at all.
+            # On a fresh install archive_day_rain is empty and the all-time
+            # queries below would come back empty anyway, so skip them entirely.
+            rain_data_exists = wx_manager.getSql( 'SELECT 1 FROM archive_day_rain LIMIT 1;' ) is not None
+
+            # Rainiest Day
+            rainiest_day_query = wx_manager.getSql( 'SELECT dateTime, sum FROM archive_day_rain WHERE dateTime >= ? ORDER BY sum DESC LIMIT 1;', ( year_start_epoch, ) )
+            if rainiest_day_query is not None:
+                rainiest_day_tuple = (rainiest_day_query[1], rain_unit, 'group_rain')
+                rainiest_day_converted = rain_round % self.generator.converter.convert(rainiest_day_tuple)[0]
+                rainiest_day = [ rainiest_day_query[0], rainiest_day_converted ]
+            else:
+                rainiest_day = [ now_gm_ts, locale.format("%.2f", 0) ]
             
 
-        # All Time Rainiest Day
-        at_rainiest_day_query = wx_manager.getSql( 'SELECT dateTime, sum FROM archive_day_rain ORDER BY sum DESC LIMIT 1' )
-        at_rainiest_day_tuple = (at_rainiest_day_query[1], rain_unit, 'group_rain')
-        at_rainiest_day_converted = rain_round % self.generator.converter.convert(at_rainiest_day_tuple)[0]
-        at_rainiest_day = [ at_rainiest_day_query[0], at_rainiest_day_converted ]
+            # All Time Rainiest Day
+            if rain_data_exists:
+                at_rainiest_day_query = wx_manager.getSql( 'SELECT dateTime, sum FROM archive_day_rain ORDER BY sum DESC LIMIT 1' )
+                at_rainiest_day_tuple = (at_rainiest_day_query[1], rain_unit, 'group_rain')
+                at_rainiest_day_converted = rain_round % self.generator.converter.convert(at_rainiest_day_tuple)[0]
+                at_rainiest_day = [ at_rainiest_day_query[0], at_rainiest_day_converted ]
+            else:
+                at_rainiest_day = [ now_gm_ts, locale.format("%.2f", 0) ]
         
 
-        # Find what kind of database we're working with and specify the correctly tailored SQL Query for each type of database
-        dataBinding = self.generator.config_dict['StdArchive']['data_binding']
-        database = self.generator.config_dict['DataBindings'][dataBinding]['database']
-        databaseType = self.generator.config_dict['Databases'][database]['database_type']
-        driver = self.generator.config_dict['DatabaseTypes'][databaseType]['driver']
-        if driver == "weedb.sqlite":
-            year_rainiest_month_sql = 'SELECT strftime("%%m", datetime(dateTime, "unixepoch")) as month, ROUND( SUM( sum ), 2 ) as total FROM archive_day_rain WHERE strftime("%%Y", datetime(dateTime, "unixepoch")) = "%s" GROUP BY month ORDER BY total DESC LIMIT 1;' % time.strftime( "%Y", time.localtime( time.time() ) )
-            at_rainiest_month_sql = 'SELECT strftime("%m", datetime(dateTime, "unixepoch")) as month, strftime("%Y", datetime(dateTime, "unixepoch")) as year, ROUND( SUM( sum ), 2 ) as total FROM archive_day_rain GROUP BY month, year ORDER BY total DESC LIMIT 1;'
-            year_rain_data_sql = 'SELECT dateTime, ROUND( sum, 2 ) FROM archive_day_rain WHERE strftime("%%Y", datetime(dateTime, "unixepoch")) = "%s";' % time.strftime( "%Y", time.localtime( time.time() ) )
-            # The all stats from http://www.weewx.com/docs/customizing.htm doesn't seem to calculate "Total Rainfall for" all time stat correctly. 
-            at_rain_highest_year_sql = 'SELECT strftime("%Y", datetime(dateTime, "unixepoch")) as year, ROUND( SUM( sum ), 2 ) as total FROM archive_day_rain GROUP BY year ORDER BY total DESC LIMIT 1;'
-        elif driver == "weedb.mysql":
-            year_rainiest_month_sql = 'SELECT FROM_UNIXTIME( dateTime, "%%m" ) AS month, ROUND( SUM( sum ), 2 ) AS total FROM archive_day_rain WHERE year( FROM_UNIXTIME( dateTime ) ) = "{0}" GROUP BY month ORDER BY total DESC LIMIT 1;'.format( time.strftime( "%Y", time.localtime( time.time() ) ) ) # Why does this one require .format() but the other's don't?
-            at_rainiest_month_sql = 'SELECT FROM_UNIXTIME( dateTime, "%%m" ) AS month, FROM_UNIXTIME( dateTime, "%%Y" ) AS year, ROUND( SUM( sum ), 2 ) AS total FROM archive_day_rain GROUP BY month, year ORDER BY total DESC LIMIT 1;'
-            year_rain_data_sql = 'SELECT dateTime, ROUND( sum, 2 ) FROM archive_day_rain WHERE year( FROM_UNIXTIME( dateTime ) ) = "%s";' % time.strftime( "%Y", time.localtime( time.time() ) )
-            # The all stats from http://www.weewx.com/docs/customizing.htm doesn't seem to calculate "Total Rainfall for" all time stat correctly. 
-            at_rain_highest_year_sql = 'SELECT FROM_UNIXTIME( dateTime, "%%Y" ) AS year, ROUND( SUM( sum ), 2 ) AS total FROM archive_day_rain GROUP BY year ORDER BY total DESC LIMIT 1;'
-            
-        # Rainiest month
-        year_rainiest_month_query = wx_manager.getSql( year_rainiest_month_sql )
-        if year_rainiest_month_query is not None:
-            year_rainiest_month_tuple = (year_rainiest_month_query[1], rain_unit, 'group_rain')
-            year_rainiest_month_converted = rain_round % self.generator.converter.convert(year_rainiest_month_tuple)[0]
-            year_rainiest_month = [ calendar.month_name[ int( year_rainiest_month_query[0] ) ], locale.format("%g", float(year_rainiest_month_converted)) ]
-        else:
-            year_rainiest_month = [ "N/A", 0.0 ]
+            # Find what kind of database we're working with and specify the correctly tailored SQL Query for each type of database
+            dataBinding = self.generator.config_dict['StdArchive']['data_binding']
+            database = self.generator.config_dict['DataBindings'][dataBinding]['database']
+            databaseType = self.generator.config_dict['Databases'][database]['database_type']
+            driver = self.generator.config_dict['DatabaseTypes'][databaseType]['driver']
+            if driver == "weedb.sqlite":
+                # SQLite evaluates strftime() once per row inside a GROUP BY,
+                # which is slow and defeats any index. One plain scan of the
+                # daily rows with the grouping done in Python feeds the rainiest
+                # month and the highest year lookups together.
+                year_month_totals = {}
+                at_month_totals = {}
+                at_year_totals = {}
+                current_year_int = int( current_year_str )
+                if rain_data_exists:
+                    for row in wx_manager.genSql( 'SELECT dateTime, sum FROM archive_day_rain;' ):
+                        if row[1] is None:
+                            continue
+                        day_tm = time.gmtime( row[0] )
+                        month_key = ( day_tm.tm_year, day_tm.tm_mon )
+                        at_month_totals[month_key] = at_month_totals.get( month_key, 0.0 ) + row[1]
+                        at_year_totals[day_tm.tm_year] = at_year_totals.get( day_tm.tm_year, 0.0 ) + row[1]
+                        if day_tm.tm_year == current_year_int:
+                            year_month_totals[day_tm.tm_mon] = year_month_totals.get( day_tm.tm_mon, 0.0 ) + row[1]
 
-        # All time rainiest month
-        at_rainiest_month_query = wx_manager.getSql( at_rainiest_month_sql )
-        at_rainiest_month_tuple = (at_rainiest_month_query[2], rain_unit, 'group_rain')
-        at_rainiest_month_converted = rain_round % self.generator.converter.convert(at_rainiest_month_tuple)[0]
-        at_rainiest_month = [ calendar.month_name[ int( at_rainiest_month_query[0] ) ] + ", " + at_rainiest_month_query[1], locale.format("%g", float(at_rainiest_month_converted)) ]
-        
-        # All time rainiest year
-        at_rain_highest_year_query = wx_manager.getSql( at_rain_highest_year_sql )
-        at_rain_highest_year_tuple = (at_rain_highest_year_query[1], rain_unit, 'group_rain')
-        #at_rain_highest_year_converted = round( self.generator.converter.convert(at_rain_highest_year_tuple)[0], rain_round )
-        at_rain_highest_year_converted = rain_round % self.generator.converter.convert(at_rain_highest_year_tuple)[0]
-        at_rain_highest_year = [ at_rain_highest_year_query[0], locale.format("%g", float(at_rain_highest_year_converted)) ]
-        
-        
-        # Consecutive days with/without rainfall
-        # dateTime needs to be epoch. Conversion done in the template using #echo
-        year_days_with_rain_total = 0
-        year_days_without_rain_total = 0
-        year_days_with_rain_output = {}
-        year_days_without_rain_output = {}
-        year_rain_query = wx_manager.genSql( year_rain_data_sql )
-        for row in year_rain_query:
-            # Original MySQL way: CASE WHEN sum!=0 THEN @total+1 ELSE 0 END
-            if row[1] != 0:
-                year_days_with_rain_total += 1
-            else:
-                year_days_with_rain_total = 0
-                
-            # Original MySQL way: CASE WHEN sum=0 THEN @total+1 ELSE 0 END
-            if row[1] == 0:
-                year_days_without_rain_total += 1
+                # Mimic the row layout of the old GROUP BY queries
+                if year_month_totals:
+                    best_month, best_total = max( year_month_totals.items(), key=operator.itemgetter(1) )
+                    year_rainiest_month_query = ( best_month, round( best_total, 2 ) )
+                else:
+                    year_rainiest_month_query = None
+                if at_month_totals:
+                    best_month_key, best_total = max( at_month_totals.items(), key=operator.itemgetter(1) )
+                    at_rainiest_month_query = ( best_month_key[1], str( best_month_key[0] ), round( best_total, 2 ) )
+                    best_year, best_total = max( at_year_totals.items(), key=operator.itemgetter(1) )
+                    at_rain_highest_year_query = ( str( best_year ), round( best_total, 2 ) )
+                else:
+                    at_rainiest_month_query = None
+                    at_rain_highest_year_query = None
+            elif driver == "weedb.mysql":
+                mysql_sql = _SQL_TEMPLATES["weedb.mysql"]
+                year_rainiest_month_query = wx_manager.getSql( mysql_sql["year_rainiest_month"], ( current_year_str, ) )
+                if rain_data_exists:
+                    at_rainiest_month_query = wx_manager.getSql( mysql_sql["at_rainiest_month"] )
+                    at_rain_highest_year_query = wx_manager.getSql( mysql_sql["at_rain_highest_year"] )
+                else:
+                    at_rainiest_month_query = None
+                    at_rain_highest_year_query = None
+
+            # Rainiest month
+            if year_rainiest_month_query is not None:
+                year_rainiest_month = [ calendar.month_name[ int( year_rainiest_month_query[0] ) ],
+                                        self._conv_fmt( [year_rainiest_month_query[1]], rain_unit, 'group_rain', rain_round )[0] ]
             else:
-                year_days_without_rain_total = 0
-            
-            year_days_with_rain_output[row[0]] = year_days_with_rain_total
-            year_days_without_rain_output[row[0]] = year_days_without_rain_total
+                year_rainiest_month = [ "N/A", 0.0 ]
 
-        if year_days_with_rain_output:
-            year_days_with_rain = max( zip( year_days_with_rain_output.values(), year_days_with_rain_output.keys() ) )
-        else:
-            year_days_with_rain = [ locale.format("%.1f", 0), calendar.timegm( time.gmtime() ) ]
-            
-        if year_days_without_rain_output:
-            year_days_without_rain = max( zip( year_days_without_rain_output.values(), year_days_without_rain_output.keys() ) )
-        else:
-            year_days_without_rain = [ locale.format("%.1f", 0), calendar.timegm( time.gmtime() ) ]
-           
-        at_days_with_rain_total = 0
-        at_days_without_rain_total = 0
-        at_days_with_rain_output = {}
-        at_days_without_rain_output = {}
-        at_rain_query = wx_manager.genSql( "SELECT dateTime, ROUND( sum, 2 ) FROM archive_day_rain;" )
-        for row in at_rain_query:
-            # Original MySQL way: CASE WHEN sum!=0 THEN @total+1 ELSE 0 END
-            if row[1] != 0:
-                at_days_with_rain_total += 1
+            # All time rainiest month
+            if at_rainiest_month_query is not None:
+                at_rainiest_month = [ calendar.month_name[ int( at_rainiest_month_query[0] ) ] + ", " + at_rainiest_month_query[1],
+                                      self._conv_fmt( [at_rainiest_month_query[2]], rain_unit, 'group_rain', rain_round )[0] ]
             else:
-                at_days_with_rain_total = 0
-                
-            # Original MySQL way: CASE WHEN sum=0 THEN @total+1 ELSE 0 END
-            if row[1] == 0:
-                at_days_without_rain_total += 1
+                at_rainiest_month = [ "N/A", 0.0 ]
+
+            # All time rainiest year
+            if at_rain_highest_year_query is not None:
+                at_rain_highest_year = [ at_rain_highest_year_query[0],
+                                         self._conv_fmt( [at_rain_highest_year_query[1]], rain_unit, 'group_rain', rain_round )[0] ]
             else:
-                at_days_without_rain_total = 0
-            
-            at_days_with_rain_output[row[0]] = at_days_with_rain_total
-            at_days_without_rain_output[row[0]] = at_days_without_rain_total
+                at_rain_highest_year = [ "N/A", 0.0 ]
+        
+        
+            # Consecutive days with/without rainfall
+            # dateTime needs to be epoch. Conversion done in the template using #echo
+            year_days_with_rain, year_days_without_rain = _find_rain_streaks( wx_manager, year_start_epoch )
+            at_days_with_rain, at_days_without_rain = _find_rain_streaks( wx_manager )
 
-        at_days_with_rain = max( zip( at_days_with_rain_output.values(), at_days_with_rain_output.keys() ) )
-        at_days_without_rain = max( zip( at_days_without_rain_output.values(), at_days_without_rain_output.keys() ) )
+            agg_stats = { 'year_outTemp_range_max': year_outTemp_range_max,
+                          'year_outTemp_range_min': year_outTemp_range_min,
+                          'at_outTemp_range_max': at_outTemp_range_max,
+                          'at_outTemp_range_min': at_outTemp_range_min,
+                          'rainiest_day': rainiest_day,
+                          'at_rainiest_day': at_rainiest_day,
+                          'year_rainiest_month': year_rainiest_month,
+                          'at_rainiest_month': at_rainiest_month,
+                          'at_rain_highest_year': at_rain_highest_year,
+                          'year_days_with_rain': year_days_with_rain,
+                          'year_days_without_rain': year_days_without_rain,
+                          'at_days_with_rain': at_days_with_rain,
+                          'at_days_without_rain': at_days_without_rain }
+            _AGG_CACHE["data"] = agg_stats
+            _AGG_CACHE["ts"] = time.time()
 
         """
         This portion is right from the weewx sample http://www.weewx.com/docs/customizing.htm
@@ -447,51 +896,10 @@ class getData(SearchList):
         noaa_header_html = ""
         default_noaa_file = ""
         noaa_dir = local_root + "/NOAA/"
-        
-        try:
-            noaa_file_list = os.listdir( noaa_dir )
 
-            # Generate a list of years based on file name
-            for f in noaa_file_list:
-                filename = f.split(".")[0] # Drop the .txt
-                year = filename.split("-")[1]
-                years.append(year)
-
-            years = sorted( set( years ) )[::-1] # Remove duplicates with set, and sort numerically, then reverse sort with [::-1] oldest year last
-            #first_year = years[0]
-            #final_year = years[-1]
-            
-            for y in years:
-                # Link to the year file
-                if os.path.exists( noaa_dir + "NOAA-%s.txt" % y ):
-                    noaa_header_html += '<a href="?yr=%s" class="noaa_rep_nav"><b>%s</b></a>:' % ( y, y )
-                else:
-                    noaa_header_html += '<span class="noaa_rep_nav"><b>%s</b></span>:' % y
-                    
-                # Loop through all 12 months and find if the file exists. 
-                # If the file doesn't exist, just show the month name in the header without a href link.
-                # There is no month 13, but we need to loop to 12, so 13 is where it stops.
-                for i in range(1, 13):
-                    month_num = format( i, '02' ) # Pad the number with a 0 since the NOAA files use 2 digit month
-                    month_abbr = calendar.month_abbr[ i ]
-                    if os.path.exists( noaa_dir + "NOAA-%s-%s.txt" % ( y, month_num ) ):
-                        noaa_header_html += ' <a href="?yr=%s&amp;mo=%s" class="noaa_rep_nav"><b>%s</b></a>' % ( y, month_num, month_abbr )
-                    else:
-                        noaa_header_html += ' <span class="noaa_rep_nav"><b>%s</b></span>' % month_abbr
-                
-                # Row build complete, push next row to new line
-                noaa_header_html += "<br>"
-                
-            # Find the current month's NOAA file for the default file to show on JavaScript page load. 
-            # The NOAA files are generated as part of this skin, but if for some reason that the month file doesn't exist, use the year file.
-            now = datetime.datetime.now()
-            current_year = str( now.year )
-            current_month = str( format( now.month, '02' ) )
-            if os.path.exists( noaa_dir + "NOAA-%s-%s.txt" % ( current_year, current_month ) ):
-                default_noaa_file = "NOAA-%s-%s.txt" % ( current_year, current_month )
-            else:
-                default_noaa_file = "NOAA-%s.txt" % current_year
-        except:
+        try:
+            years, noaa_header_html, default_noaa_file = _build_noaa_data( noaa_dir )
+        except ( IOError, OSError ):
             # There's an error - I've seen this on first run and the NOAA folder is not created yet. Skip this section.
             pass
 
@@ -499,6 +907,7 @@ class getData(SearchList):
         """
         Forecast Data
         """
+        forecast_is_stale = False
         if self.generator.skin_dict['Extras']['forecast_enabled'] == "1":
             forecast_file = local_root + "/json/darksky_forecast.json"
             forecast_json_url = belchertown_root_url + "/json/darksky_forecast.json"
@@ -509,61 +918,106 @@ class getData(SearchList):
             longitude = self.generator.config_dict['Station']['longitude']
             forecast_alert_enabled = int( self.generator.skin_dict['Extras']['forecast_alert_enabled'] )
             forecast_stale_timer = self.generator.skin_dict['Extras']['forecast_stale']
-            forecast_is_stale = False
             
             forecast_url = "https://api.darksky.net/forecast/%s/%s,%s?units=%s&lang=%s" % ( darksky_secret_key, latitude, longitude, darksky_units, darksky_lang )
             
-            # Determine if the file exists and get it's modified time
-            if os.path.isfile( forecast_file ):
-                if ( int( time.time() ) - int( os.path.getmtime( forecast_file ) ) ) > int( forecast_stale_timer ):
-                    forecast_is_stale = True
+            if _FORECAST_CACHE["data"] is not None and ( time.time() - _FORECAST_CACHE["checked"] ) < float( forecast_stale_timer ):
+                # The file was verified against disk recently; reuse the
+                # cached fields with no stat at all
+                forecast_file_mtime = _FORECAST_CACHE["mtime"]
             else:
-                # File doesn't exist, download a new copy
-                forecast_is_stale = True
+                # Determine if the file exists and get it's modified time with a single stat call
+                try:
+                    forecast_file_mtime = os.stat( forecast_file ).st_mtime
+                except OSError:
+                    # File doesn't exist, download a new copy
+                    forecast_file_mtime = 0
+                    forecast_is_stale = True
+                else:
+                    if ( time.time() - forecast_file_mtime ) > float( forecast_stale_timer ):
+                        forecast_is_stale = True
+                    else:
+                        _FORECAST_CACHE["checked"] = time.time()
+        
+        """
+        Earthquake Data
+        """
+        earthquake_is_stale = False
+        # Only process if Earthquake data is enabled
+        if self.generator.skin_dict['Extras']['earthquake_enabled'] == "1":
+            earthquake_file = local_root + "/json/earthquake.json"
+            earthquake_stale_timer = self.generator.skin_dict['Extras']['earthquake_stale']
+            latitude = self.generator.config_dict['Station']['latitude']
+            longitude = self.generator.config_dict['Station']['longitude']
+            earthquake_maxradiuskm = self.generator.skin_dict['Extras']['earthquake_maxradiuskm']
+            #Sample URL from Belchertown Weather: http://earthquake.usgs.gov/fdsnws/event/1/query?limit=1&lat=42.223&lon=-72.374&maxradiuskm=1000&format=geojson&nodata=204&minmag=2
+            earthquake_url = "http://earthquake.usgs.gov/fdsnws/event/1/query?limit=1&lat=%s&lon=%s&maxradiuskm=%s&format=geojson&nodata=204&minmag=2" % ( latitude, longitude, earthquake_maxradiuskm )
             
-            # File is stale, download a new copy
-            if forecast_is_stale:
-                # Download new forecast data
+            if _EQ_CACHE["data"] is not None and ( time.time() - _EQ_CACHE["checked"] ) < float( earthquake_stale_timer ):
+                # The file was verified against disk recently; reuse the
+                # cached fields with no stat at all
+                earthquake_file_mtime = _EQ_CACHE["mtime"]
+            else:
+                # Determine if the file exists and get it's modified time with a single stat call
                 try:
-                    import urllib2
-                    user_agent = 'Mozilla/5.0 (Macintosh; U; Intel Mac OS X 10_6_4; en-US) AppleWebKit/534.3 (KHTML, like Gecko) Chrome/6.0.472.63 Safari/534.3'
-                    headers = { 'User-Agent' : user_agent }
-                    req = urllib2.Request( forecast_url, None, headers )
-                    response = urllib2.urlopen( req )
-                    page = response.read()
-                    response.close()
-                except Exception as error:
-                    raise Warning( "Error downloading forecast data. Check the URL in your configuration and try again. You are trying to use URL: %s, and the error is: %s" % ( forecast_url, error ) )
+                    earthquake_file_mtime = os.stat( earthquake_file ).st_mtime
+                except OSError:
+                    # File doesn't exist, download a new copy
+                    earthquake_file_mtime = 0
+                    earthquake_is_stale = True
+                else:
+                    if ( time.time() - earthquake_file_mtime ) > float( earthquake_stale_timer ):
+                        earthquake_is_stale = True
+                    else:
+                        _EQ_CACHE["checked"] = time.time()
+        
+        # Start the stale downloads together before waiting on either one, so
+        # the two independent round-trips overlap instead of running
+        # back-to-back.
+        if forecast_is_stale:
+            forecast_download = _start_download( forecast_url, _HEADERS )
+        if earthquake_is_stale:
+            earthquake_download = _start_download( earthquake_url, _HEADERS )
+        
+        # Save and process the forecast data
+        if self.generator.skin_dict['Extras']['forecast_enabled'] == "1":
+            if forecast_is_stale:
+                # Wait for the new forecast data
+                forecast_thread, forecast_result = forecast_download
+                forecast_thread.join()
+                if "error" in forecast_result:
+                    raise Warning( "Error downloading forecast data. Check the URL in your configuration and try again. You are trying to use URL: %s, and the error is: %s" % ( forecast_url, forecast_result["error"] ) )
+                page = forecast_result["data"]
                     
-                # Save forecast data to file. w+ creates the file if it doesn't exist, and truncates the file and re-writes it everytime
+                # Save forecast data to file atomically, so it's either the old copy or the new one
                 try:
-                    with open( forecast_file, 'w+' ) as file:
-                        file.write( page )
-                        loginf( "New forecast file downloaded to %s" % forecast_file )
-                except IOError, e:
+                    _atomic_write( forecast_file, page )
+                    loginf( "New forecast file downloaded to %s" % forecast_file )
+                except ( IOError, OSError ) as e:
                     raise Warning( "Error writing forecast info to %s. Reason: %s" % ( forecast_file, e) )
 
-            # Process the forecast file
-            with open( forecast_file, "r" ) as read_file:
-                data = json.load( read_file )
+            # Process the forecast file, reusing the extracted fields when the file on disk is unchanged
+            if not forecast_is_stale and _FORECAST_CACHE["data"] is not None and _FORECAST_CACHE["mtime"] == forecast_file_mtime:
+                forecast_fields = _FORECAST_CACHE["data"]
+            else:
+                with open( forecast_file, "r" ) as read_file:
+                    forecast_fields = _extract_forecast_fields( json.load( read_file ) )
+                try:
+                    _FORECAST_CACHE["mtime"] = os.stat( forecast_file ).st_mtime
+                except OSError:
+                    _FORECAST_CACHE["mtime"] = 0
+                _FORECAST_CACHE["checked"] = time.time()
+                _FORECAST_CACHE["data"] = forecast_fields
             
-            current_obs_summary = label_dict[ data["currently"]["summary"].lower() ]
-            visibility = locale.format("%g", float( data["currently"]["visibility"] ) )
+            current_obs_summary = label_dict[ forecast_fields["summary"].lower() ]
+            visibility = locale.format("%g", float( forecast_fields["visibility"] ) )
             
-            if data["currently"]["icon"] == "partly-cloudy-night":
-                current_obs_icon = '<img id="wxicon" src="'+belchertown_root_url+'/images/partly-cloudy-night.png">'
-            else:
-                current_obs_icon = '<img id="wxicon" src="'+belchertown_root_url+'/images/'+data["currently"]["icon"]+'.png">'
+            current_obs_icon = '<img id="wxicon" src="%s/images/%s.png">' % ( belchertown_root_url, forecast_fields["icon"] )
 
             # Even though we specify the DarkSky unit as darksky_units, if the user selects "auto" as their unit
             # then we don't know what DarkSky will return for visibility. So always use the DarkSky output to 
             # tell us what unit they are using. This fixes the guessing game for what label to use for the DarkSky "auto" unit
-            if ( data["flags"]["units"].lower() == "us" ) or ( data["flags"]["units"].lower() == "uk2" ):
-                visibility_unit = "miles"
-            elif ( data["flags"]["units"].lower() == "si" ) or ( data["flags"]["units"].lower() == "ca" ):
-                visibility_unit = "km"
-            else:
-                visibility_unit = ""
+            visibility_unit = _VIS_UNITS.get( forecast_fields["units"].lower(), "" )
                 
         else:
             forecast_json_url = ""
@@ -572,48 +1026,21 @@ class getData(SearchList):
             visibility = ""
             visibility_unit = ""
         
-        
-        """
-        Earthquake Data
-        """
-        # Only process if Earthquake data is enabled
+        # Save and process the earthquake data
         if self.generator.skin_dict['Extras']['earthquake_enabled'] == "1":
-            earthquake_file = local_root + "/json/earthquake.json"
-            earthquake_stale_timer = self.generator.skin_dict['Extras']['earthquake_stale']
-            latitude = self.generator.config_dict['Station']['latitude']
-            longitude = self.generator.config_dict['Station']['longitude']
-            earthquake_maxradiuskm = self.generator.skin_dict['Extras']['earthquake_maxradiuskm']
-            #Sample URL from Belchertown Weather: http://earthquake.usgs.gov/fdsnws/event/1/query?limit=1&lat=42.223&lon=-72.374&maxradiuskm=1000&format=geojson&nodata=204&minmag=2
-            earthquake_url = "http://earthquake.usgs.gov/fdsnws/event/1/query?limit=1&lat=%s&lon=%s&maxradiuskm=%s&format=geojson&nodata=204&minmag=2" % ( latitude, longitude, earthquake_maxradiuskm )
-            earthquake_is_stale = False
-            
-            # Determine if the file exists and get it's modified time
-            if os.path.isfile( earthquake_file ):
-                if ( int( time.time() ) - int( os.path.getmtime( earthquake_file ) ) ) > int( earthquake_stale_timer ):
-                    earthquake_is_stale = True
-            else:
-                # File doesn't exist, download a new copy
-                earthquake_is_stale = True
-            
-            # File is stale, download a new copy
             if earthquake_is_stale:
-                # Download new earthquake data
-                try:
-                    import urllib2
-                    user_agent = 'Mozilla/5.0 (Macintosh; U; Intel Mac OS X 10_6_4; en-US) AppleWebKit/534.3 (KHTML, like Gecko) Chrome/6.0.472.63 Safari/534.3'
-                    headers = { 'User-Agent' : user_agent }
-                    req = urllib2.Request( earthquake_url, None, headers )
-                    response = urllib2.urlopen( req )
-                    page = response.read()
-                    response.close()
+                # Wait for the new earthquake data
+                earthquake_thread, earthquake_result = earthquake_download
+                earthquake_thread.join()
+                if "error" not in earthquake_result:
+                    page = earthquake_result["data"]
                     if weewx.debug:
                         logdbg( "Downloading earthquake data using urllib2 was successful" )
-                except Exception as error:
+                else:
                     if weewx.debug:
                         logdbg( "Error downloading earthquake data with urllib2, reverting to curl and subprocess" )
                     # Nested try - only execute if the urllib2 method fails
                     try:
-                        import subprocess
                         command = 'curl -L --silent "%s"' % earthquake_url
                         p = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
                         page = p.communicate()[0]
@@ -622,27 +1049,40 @@ class getData(SearchList):
                     except Exception as error:
                         raise Warning( "Error downloading earthquake data using urllib2 and subprocess curl. Your software may need to be updated, or the URL is incorrect. You are trying to use URL: %s, and the error is: %s" % ( earthquake_url, error ) )
 
-                # Save earthquake data to file. w+ creates the file if it doesn't exist, and truncates the file and re-writes it everytime
+                # Save earthquake data to file atomically, so it's either the old copy or the new one
                 try:
-                    with open( earthquake_file, 'w+' ) as file:
-                        file.write( page )
-                        if weewx.debug:
-                            logdbg( "Earthquake data saved to %s" % earthquake_file )
-                except IOError, e:
+                    _atomic_write( earthquake_file, page )
+                    if weewx.debug:
+                        logdbg( "Earthquake data saved to %s" % earthquake_file )
+                except ( IOError, OSError ) as e:
                     raise Warning( "Error writing earthquake data to %s. Reason: %s" % ( earthquake_file, e) )
 
-            # Process the earthquake file        
-            with open( earthquake_file, "r" ) as read_file:
-                eqdata = json.load( read_file )
+            # Process the earthquake file, reusing the extracted fields when the file on disk is unchanged
+            if not earthquake_is_stale and _EQ_CACHE["mtime"] == earthquake_file_mtime:
+                eq_fields = _EQ_CACHE["data"]
+            else:
+                with open( earthquake_file, "r" ) as read_file:
+                    eqdata = json.load( read_file )
+                try:
+                    eq_fields = _extract_eq_fields( eqdata )
+                except ( KeyError, IndexError, TypeError ):
+                    # No earthquake data
+                    eq_fields = None
+                try:
+                    _EQ_CACHE["mtime"] = os.stat( earthquake_file ).st_mtime
+                except OSError:
+                    _EQ_CACHE["mtime"] = 0
+                _EQ_CACHE["checked"] = time.time()
+                _EQ_CACHE["data"] = eq_fields
             
-            try:
-                eqtime = eqdata["features"][0]["properties"]["time"] / 1000
-                equrl = eqdata["features"][0]["properties"]["url"]
-                eqplace = eqdata["features"][0]["properties"]["place"]
-                eqmag = eqdata["features"][0]["properties"]["mag"]
-                eqlat = str( round( eqdata["features"][0]["geometry"]["coordinates"][0], 4 ) )
-                eqlon = str( round( eqdata["features"][0]["geometry"]["coordinates"][1], 4 ) )
-            except:
+            if eq_fields is not None:
+                eqtime = eq_fields["time"] / 1000
+                equrl = eq_fields["url"]
+                eqplace = eq_fields["place"]
+                eqmag = eq_fields["mag"]
+                eqlat = str( round( eq_fields["lat"], 4 ) )
+                eqlon = str( round( eq_fields["lon"], 4 ) )
+            else:
                 # No earthquake data
                 eqtime = label_dict["earthquake_no_data"]
                 equrl = ""
@@ -662,22 +1102,24 @@ class getData(SearchList):
         """
         Get Current Station Observation Data
         """
-        station_obs_json = OrderedDict()
-        station_obs_rounding_json = OrderedDict()
-        station_obs_unit_labels_json = OrderedDict()
-        station_obs_trend_json = OrderedDict()
-        station_obs_html = ""
-        station_observations = self.generator.skin_dict['Extras']['station_observations']
-        # Check if this is a list. If not then we have 1 item, so force it into a list
-        if isinstance(station_observations, list) is False:
-            station_observations = station_observations.split()
+        station_obs_json = _ODict()
+        station_obs_rounding_json = _ODict()
+        station_obs_unit_labels_json = _ODict()
+        station_obs_trend_json = _ODict()
+        station_obs_parts = []
+        station_observations = self._station_observations
         currentStamp = manager.lastGoodStamp()
         current = weewx.tags.CurrentObj(db_lookup, None, currentStamp, self.generator.formatter, self.generator.converter)
+        # Bind the per-observation lookup tables to locals once; none of them
+        # change while the loop runs.
+        obs_group_dict = weewx.units.obs_group_dict
+        group_unit_dict = self.generator.converter.group_unit_dict
+        string_formats = self.generator.skin_dict['Units']['StringFormats']
+        unit_labels = self.generator.skin_dict['Units']['Labels']
         for obs in station_observations:
             if obs == "visibility":
                 try:
                     obs_output = str(visibility) + " " + str(visibility_unit)
-                    station_obs_unit_labels_json["visibility"] = visibility_unit
                 except:
                     raise Warning( "Error adding visiblity to station observations table. Check that you have DarkSky forecast data, or remove visibility from your station_observations Extras option." )
             elif obs == "rainWithRainRate":
@@ -690,18 +1132,18 @@ class getData(SearchList):
                 obs_rain_output += "<span class='rainRate'>%s</span><!-- AJAX -->" % str(getattr(current, "rainRate"))
                 
                 # Special rain rounding and label gathering, save as dayRain for JavaScript and MQTT
-                rain_obs_group = weewx.units.obs_group_dict["rain"]
-                rain_obs_unit = self.generator.converter.group_unit_dict[rain_obs_group]
-                rain_obs_round = self.generator.skin_dict['Units']['StringFormats'].get(rain_obs_unit, "0")[2]
-                rain_obs_unit_label = self.generator.skin_dict['Units']['Labels'].get(rain_obs_unit, "")
+                rain_obs_group = obs_group_dict["rain"]
+                rain_obs_unit = group_unit_dict[rain_obs_group]
+                rain_obs_round = string_formats.get(rain_obs_unit, "0")[2]
+                rain_obs_unit_label = unit_labels.get(rain_obs_unit, "")
                 station_obs_rounding_json["dayRain"] = str(rain_obs_round)
                 station_obs_unit_labels_json["dayRain"] = str(rain_obs_unit_label)
 
                 # Special rainRate rounding and label gathering
-                rainRate_obs_group = weewx.units.obs_group_dict["rainRate"]
-                rainRate_obs_unit = self.generator.converter.group_unit_dict[rainRate_obs_group]
-                rainRate_obs_round = self.generator.skin_dict['Units']['StringFormats'].get(rainRate_obs_unit, "0")[2]
-                rainRate_obs_unit_label = self.generator.skin_dict['Units']['Labels'].get(rainRate_obs_unit, "")
+                rainRate_obs_group = obs_group_dict["rainRate"]
+                rainRate_obs_unit = group_unit_dict[rainRate_obs_group]
+                rainRate_obs_round = string_formats.get(rainRate_obs_unit, "0")[2]
+                rainRate_obs_unit_label = unit_labels.get(rainRate_obs_unit, "")
                 station_obs_rounding_json["rainRate"] = str(rainRate_obs_round)
                 station_obs_unit_labels_json["rainRate"] = str(rainRate_obs_unit_label)
                 
@@ -713,55 +1155,51 @@ class getData(SearchList):
                     # Try to catch those invalid observations, like 'uv' needs to be 'UV'. 
                     obs_output = "Invalid observation"
                 
-            # Get observation rounding and unit label
-            try: 
-                # Find the group this observation is in 
-                obs_group = weewx.units.obs_group_dict[obs]
-                # Find the group_name for this obs group
-                obs_unit = self.generator.converter.group_unit_dict[obs_group]
+            # Get observation rounding and unit label. Observations without a
+            # unit group (like rainWithRainRate) get empty values, without
+            # paying for an exception on every such iteration.
+            obs_group = obs_group_dict.get(obs)
+            obs_unit = group_unit_dict.get(obs_group) if obs_group is not None else None
+            if obs_unit is not None:
                 # Find the number of decimals to round to based on group name
-                obs_round = self.generator.skin_dict['Units']['StringFormats'].get(obs_unit, "0")[2]
+                obs_round = string_formats.get(obs_unit, "0")[2]
                 # Get the unit's label
-                obs_unit_label = self.generator.skin_dict['Units']['Labels'].get(obs_unit, "")
-            except:
+                obs_unit_label = unit_labels.get(obs_unit, "")
+            else:
                 obs_round = ""
                 obs_unit_label = ""
+            if obs == "visibility":
+                # The visibility unit comes from the DarkSky response, not weewx
+                obs_unit_label = visibility_unit
 
-            # Build the json "current" array for weewx_data.json for JavaScript
-            if obs not in station_obs_json:
-                station_obs_json[obs] = str(obs_output)
-            # Build the json "rounding" array for weewx_data.json for JavaScript
-            if obs not in station_obs_rounding_json:
-                station_obs_rounding_json[obs] = str(obs_round)
-            # Build the json "unit_labels" array for weewx_data.json for JavaScript
-            if obs not in station_obs_unit_labels_json:
-                station_obs_unit_labels_json[obs] = str(obs_unit_label)
+            # Build the json "current", "rounding" and "unit_labels" arrays for
+            # weewx_data.json for JavaScript. station_observations was deduped
+            # at init, so each obs is assigned exactly once.
+            station_obs_json[obs] = str(obs_output)
+            station_obs_rounding_json[obs] = str(obs_round)
+            station_obs_unit_labels_json[obs] = str(obs_unit_label)
             
-            # Build the HTML for the front page
-            station_obs_html += "<tr>"
-            station_obs_html += "<td class='station-observations-label'>%s</td>" % label_dict[obs]
-            station_obs_html += "<td>"
+            # Build the HTML for the front page, one template format per row
             if obs == "rainWithRainRate":
                 # Add special rain + rainRate one liner
-                station_obs_html += obs_rain_output
-            else:
-                station_obs_html += "<span class=%s>%s</span><!-- AJAX -->" % ( obs, obs_output )
-            if obs == "barometer" or obs == "pressure" or obs == "altimeter":
+                station_obs_parts.append( _OBS_ROW_RAW_TMPL % ( label_dict[obs], obs_rain_output ) )
+            elif obs == "barometer" or obs == "pressure" or obs == "altimeter":
                 # Append the trend arrow to the pressure observation. Need this for non-mqtt pages
                 trend = weewx.tags.TrendObj(10800, 300, db_lookup, None, currentStamp, self.generator.formatter, self.generator.converter)
                 obs_trend = getattr(trend, obs)
-                station_obs_html += ' <span class="pressure-trend">' # Maintain leading spacing
                 if str(obs_trend) == "N/A":
-                    pass
+                    trend_arrow = ""
                 elif "-" in str(obs_trend):
-                    station_obs_html += '<i class="fa fa-arrow-down barometer-down"></i>'
+                    trend_arrow = '<i class="fa fa-arrow-down barometer-down"></i>'
                     station_obs_trend_json["pressure"] = "down"
                 else:
-                    station_obs_html += '<i class="fa fa-arrow-up barometer-up"></i>'
+                    trend_arrow = '<i class="fa fa-arrow-up barometer-up"></i>'
                     station_obs_trend_json["pressure"] = "up"
-                station_obs_html += '</span>' # Close the span
-            station_obs_html += "</td>"
-            station_obs_html += "</tr>"
+                station_obs_parts.append( _OBS_ROW_TREND_TMPL % ( label_dict[obs], obs, obs_output, trend_arrow ) )
+            else:
+                station_obs_parts.append( _OBS_ROW_TMPL % ( label_dict[obs], obs, obs_output ) )
+        
+        station_obs_html = "".join( station_obs_parts )
                 
         """
         Social Share
@@ -773,27 +1211,12 @@ class getData(SearchList):
         twitter_hashtags = label_dict["twitter_hashtags"]
                 
         if facebook_enabled == "1": 
-            facebook_html = """
-                <div id="fb-root"></div>
-                <script>(function(d, s, id) {
-                  var js, fjs = d.getElementsByTagName(s)[0];
-                  if (d.getElementById(id)) return;
-                  js = d.createElement(s); js.id = id;
-                  js.src = "//connect.facebook.net/en_US/sdk.js#xfbml=1&version=v2.5";
-                  fjs.parentNode.insertBefore(js, fjs);
-                }(document, 'script', 'facebook-jssdk'));</script>
-                <div class="fb-like" data-href="%s" data-width="500px" data-layout="button_count" data-action="like" data-show-faces="false" data-share="true"></div>
-            """ % belchertown_root_url
+            facebook_html = _FB_HTML_TMPL % belchertown_root_url
         else:
             facebook_html = ""
         
         if twitter_enabled == "1":
-            twitter_html = """
-                <script>
-                    !function(d,s,id){var js,fjs=d.getElementsByTagName(s)[0],p=/^http:/.test(d.location)?'http':'https';if(!d.getElementById(id)){js=d.createElement(s);js.id=id;js.src=p+'://platform.twitter.com/widgets.js';fjs.parentNode.insertBefore(js,fjs);}}(document, 'script', 'twitter-wjs');
-                </script>
-                <a href="https://twitter.com/share" class="twitter-share-button" data-url="%s" data-text="%s" data-via="%s" data-hashtags="%s">Tweet</a>
-            """ % ( belchertown_root_url, twitter_text, twitter_owner, twitter_hashtags )
+            twitter_html = _TW_HTML_TMPL % ( belchertown_root_url, twitter_text, twitter_owner, twitter_hashtags )
         else:
             twitter_html = ""
         
@@ -831,19 +1254,19 @@ class getData(SearchList):
                                   'chartgroup_titles_dict': chartgroup_titles,
                                   'graph_page_buttons': graph_page_buttons,
                                   'alltime' : all_stats,
-                                  'year_outTemp_range_max': year_outTemp_range_max,
-                                  'year_outTemp_range_min': year_outTemp_range_min,
-                                  'at_outTemp_range_max' : at_outTemp_range_max,
-                                  'at_outTemp_range_min': at_outTemp_range_min,
-                                  'rainiest_day': rainiest_day,
-                                  'at_rainiest_day': at_rainiest_day,
-                                  'year_rainiest_month': year_rainiest_month,
-                                  'at_rainiest_month': at_rainiest_month,
-                                  'at_rain_highest_year': at_rain_highest_year,
-                                  'year_days_with_rain': year_days_with_rain,
-                                  'year_days_without_rain': year_days_without_rain,
-                                  'at_days_with_rain': at_days_with_rain,
-                                  'at_days_without_rain': at_days_without_rain,
+                                  'year_outTemp_range_max': agg_stats['year_outTemp_range_max'],
+                                  'year_outTemp_range_min': agg_stats['year_outTemp_range_min'],
+                                  'at_outTemp_range_max' : agg_stats['at_outTemp_range_max'],
+                                  'at_outTemp_range_min': agg_stats['at_outTemp_range_min'],
+                                  'rainiest_day': agg_stats['rainiest_day'],
+                                  'at_rainiest_day': agg_stats['at_rainiest_day'],
+                                  'year_rainiest_month': agg_stats['year_rainiest_month'],
+                                  'at_rainiest_month': agg_stats['at_rainiest_month'],
+                                  'at_rain_highest_year': agg_stats['at_rain_highest_year'],
+                                  'year_days_with_rain': agg_stats['year_days_with_rain'],
+                                  'year_days_without_rain': agg_stats['year_days_without_rain'],
+                                  'at_days_with_rain': agg_stats['at_days_with_rain'],
+                                  'at_days_without_rain': agg_stats['at_days_without_rain'],
                                   'windSpeedUnitLabel': windSpeedUnitLabel,
                                   'noaa_header_html': noaa_header_html,
                                   'default_noaa_file': default_noaa_file,
@@ -853,9 +1276,9 @@ class getData(SearchList):
                                   'visibility': visibility,
                                   'visibility_unit': visibility_unit,
                                   'station_obs_json': json.dumps(station_obs_json),
-                                  'station_obs_rounding_json': json.dumps(station_obs_rounding_json),
-                                  'station_obs_unit_labels_json': json.dumps(station_obs_unit_labels_json),
-                                  'station_obs_trend_json': json.dumps(station_obs_trend_json),
+                                  'station_obs_rounding_json': _cached_dumps(station_obs_rounding_json),
+                                  'station_obs_unit_labels_json': _cached_dumps(station_obs_unit_labels_json),
+                                  'station_obs_trend_json': _cached_dumps(station_obs_trend_json),
                                   'station_obs_html': station_obs_html,
                                   'earthquake_time': eqtime,
                                   'earthquake_url': equrl,
@@ -905,9 +1328,18 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
             self.skin_dict.get('skin', ''),
             'graphs.conf.example')
         if os.path.exists( chart_config_path ):
-            self.chart_dict = configobj.ConfigObj(chart_config_path, file_error=True)
+            config_path = chart_config_path
         else:
-            self.chart_dict = configobj.ConfigObj(default_chart_config_path, file_error=True)
+            config_path = default_chart_config_path
+        chart_config_mtime = os.path.getmtime( config_path )
+        if _GEN_CHART_CACHE["path"] == config_path and _GEN_CHART_CACHE["mtime"] == chart_config_mtime:
+            self.chart_dict = _GEN_CHART_CACHE["obj"]
+        else:
+            self.chart_dict = configobj.ConfigObj(config_path, file_error=True)
+            _coerce_chart_ints( self.chart_dict )
+            _GEN_CHART_CACHE["path"] = config_path
+            _GEN_CHART_CACHE["mtime"] = chart_config_mtime
+            _GEN_CHART_CACHE["obj"] = self.chart_dict
         
         self.converter = weewx.units.Converter.fromSkinDict(self.skin_dict)
         self.formatter = weewx.units.Formatter.fromSkinDict(self.skin_dict)
@@ -928,10 +1360,31 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
         # Final output dict
         output = {}
         
+        # Timespan resolutions and SQL vectors memoized across plots for this run
+        self._span_cache = {}
+        self._vector_cache = {}
+        self._groupby_cache = {}
+        self._groupby_ctx = None
+        self._conv_ctx_cache = {}
+        self._label_cache = {}
+        
+        # Hoisted out of the loops below: the formats section never changes
+        # during a run
+        string_formats = self.skin_dict['Units']['StringFormats']
+        
+        # Where the chart_group JSON files land. Resolved once; the directory
+        # only needs creating on the first ever run.
+        html_dest_dir = os.path.join(self.config_dict['WEEWX_ROOT'],
+                                 self.skin_dict['HTML_ROOT'],
+                                 "json")
+        if not os.path.exists( html_dest_dir ):
+            os.makedirs( html_dest_dir )
+        
         # Loop through each timespan
         for chart_group in self.chart_dict.sections:
-            output[chart_group] = OrderedDict() # This retains the order in which to load the charts on the page.
-            chart_options = weeutil.weeutil.accumulateLeaves(self.chart_dict[chart_group])
+            group_section = self.chart_dict[chart_group]
+            output[chart_group] = _ODict() # This retains the order in which to load the charts on the page.
+            chart_options = weeutil.weeutil.accumulateLeaves(group_section)
                 
             output[chart_group]["belchertown_version"] = VERSION
             output[chart_group]["generated_timestamp"] = time.strftime('%m/%d/%Y %H:%M:%S')
@@ -950,15 +1403,16 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
             output[chart_group]["tooltip_date_format"] = tooltip_date_format
             
             # Loop through each chart within the chart_group
-            for plotname in self.chart_dict[chart_group].sections:
+            for plotname in group_section.sections:
+                plot_section = group_section[plotname]
                 output[chart_group][plotname] = {}
-                output[chart_group][plotname]["series"] = OrderedDict() # This retains the observation position in the dictionary to match the order in the conf so the chart is in the right user-defined order
+                output[chart_group][plotname]["series"] = _ODict() # This retains the observation position in the dictionary to match the order in the conf so the chart is in the right user-defined order
                 output[chart_group][plotname]["options"] = {}
                 #output[chart_group][plotname]["options"]["renderTo"] = chart_group + plotname # daychart1, weekchart1, etc. Used for the graphs page and the different chart_groups
                 output[chart_group][plotname]["options"]["renderTo"] = plotname # daychart1, weekchart1, etc. Used for the graphs page and the different chart_groups
                 output[chart_group][plotname]["options"]["chart_group"] = chart_group
                 
-                plot_options = weeutil.weeutil.accumulateLeaves(self.chart_dict[chart_group][plotname])
+                plot_options = _overlay_leaves(chart_options, plot_section)
                 
                 plotgen_ts = self.gen_ts
                 if not plotgen_ts:
@@ -966,53 +1420,18 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
                     if not plotgen_ts:
                         plotgen_ts = time.time()
                 
-                # Look for any keyword timespans first and default to those start/stop times for the chart
+                # Look for any keyword timespans first and default to those start/stop times for the chart.
+                # Most plots in a chart_group share the same timespan options, so the resolution is memoized per run.
                 time_length = plot_options.get('time_length', 86400)
                 time_ago = int(plot_options.get('time_ago', 1))
                 day_specific = plot_options.get('day_specific', 1) # Force a day so we don't error out
                 month_specific = plot_options.get('month_specific', 8) # Force a month so we don't error out
                 year_specific = plot_options.get('year_specific', 2019) # Force a year so we don't error out
-                if time_length == "today":
-                    minstamp, maxstamp = archiveDaySpan( self.timespan.stop )
-                elif time_length == "week":
-                    week_start = to_int(self.config_dict["Station"].get('week_start', 6))              
-                    minstamp, maxstamp = archiveWeekSpan( self.timespan.stop, week_start )
-                elif time_length == "month":
-                    minstamp, maxstamp = archiveMonthSpan( self.timespan.stop )
-                elif time_length == "year":
-                    minstamp, maxstamp = archiveYearSpan( self.timespan.stop )
-                elif time_length == "days_ago":
-                    minstamp, maxstamp = archiveDaySpan( self.timespan.stop, days_ago=time_ago )
-                elif time_length == "weeks_ago":
-                    week_start = to_int(self.config_dict["Station"].get('week_start', 6))              
-                    minstamp, maxstamp = archiveWeekSpan( self.timespan.stop, week_start, weeks_ago=time_ago )
-                elif time_length == "months_ago":
-                    minstamp, maxstamp = archiveMonthSpan( self.timespan.stop, months_ago=time_ago )
-                elif time_length == "years_ago":
-                    minstamp, maxstamp = archiveYearSpan( self.timespan.stop, years_ago=time_ago )
-                elif time_length == "day_specific":
-                    # Set an arbitrary hour within the specific day to get that full day timespan and not the day before. e.g. 1pm
-                    day_dt = datetime.datetime.strptime(str(year_specific) + '-' + str(month_specific) + '-' + str(day_specific) + ' 13', '%Y-%m-%d %H')
-                    daystamp = int(time.mktime(day_dt.timetuple()))
-                    minstamp, maxstamp = archiveDaySpan( daystamp )
-                elif time_length == "month_specific":
-                    # Set an arbitrary day within the specific month to get that full month timespan and not the day before. e.g. 5th day
-                    month_dt = datetime.datetime.strptime(str(year_specific) + '-' + str(month_specific) + '-5', '%Y-%m-%d')
-                    monthstamp = int(time.mktime(month_dt.timetuple()))
-                    minstamp, maxstamp = archiveMonthSpan( monthstamp )
-                elif time_length == "year_specific":
-                    # Get a date in the middle of the year to get the full year epoch so weewx can find the year timespan. 
-                    year_dt = datetime.datetime.strptime(str(year_specific) + '-8-1', '%Y-%m-%d')
-                    yearstamp = int(time.mktime(year_dt.timetuple()))
-                    minstamp, maxstamp = archiveYearSpan( yearstamp )
-                elif time_length == "all":
-                    minstamp = self.start_ts
-                    maxstamp = self.stop_ts
-                else:
-                    # Rolling timespans using seconds
-                    time_length = int(time_length) # Convert to int() for minstamp math and for point_timestamp conditional later
-                    minstamp = plotgen_ts - time_length # Take the generation time and subtract the time_length to get our start time
-                    maxstamp = plotgen_ts
+                span_key = ( time_length, time_ago, day_specific, month_specific, year_specific, plotgen_ts )
+                span_hit = self._span_cache.get( span_key )
+                if span_hit is None:
+                    span_hit = self._span_cache[span_key] = self._resolve_timespan( time_length, time_ago, day_specific, month_specific, year_specific, plotgen_ts )
+                time_length, minstamp, maxstamp = span_hit
                 
                 chart_title = plot_options.get("title", "")
                 output[chart_group][plotname]["options"]["title"] = chart_title
@@ -1047,11 +1466,12 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
                 output[chart_group][plotname]["options"]["plot_tooltip_date_format"] = plot_tooltip_date_format
                 
                 # Loop through each observation within the chart chart_group
-                for line_name in self.chart_dict[chart_group][plotname].sections:
+                for line_name in plot_section.sections:
+                    line_section = plot_section[line_name]
                     output[chart_group][plotname]["series"][line_name] = {}
                     output[chart_group][plotname]["series"][line_name]["obsType"] = line_name
                     
-                    line_options = weeutil.weeutil.accumulateLeaves(self.chart_dict[chart_group][plotname][line_name])
+                    line_options = _overlay_leaves(plot_options, line_section)
                     
                     # Find the observation type if specified (e.g. more than 1 of the same on a chart). (e.g. outTemp, rainFall, windDir, etc.)
                     observation_type = line_options.get('observation_type', line_name)
@@ -1067,7 +1487,13 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
                         obs_label = "rain"
                     else:
                         obs_label = observation_type
-                    unit_label = line_options.get('yAxisLabel_unit', weewx.units.get_label_string(self.formatter, self.converter, obs_label))
+                    # Get the unit label, resolved once per observation type per run.
+                    # As a .get() default it was also computed even when overridden.
+                    unit_label = line_options.get('yAxisLabel_unit')
+                    if unit_label is None:
+                        unit_label = self._label_cache.get(obs_label)
+                        if unit_label is None:
+                            unit_label = self._label_cache[obs_label] = weewx.units.get_label_string(self.formatter, self.converter, obs_label)
                     
                     # Set the yAxis label. Place into series for custom JavaScript. Highcharts will ignore these by default
                     yAxisLabel_config = line_options.get('yAxisLabel', None)
@@ -1101,7 +1527,7 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
                     # Build the final array items. 
                     
                     # This for loop is to get any user provided highcharts series config data. Built-in highcharts variable names accepted.  
-                    for highcharts_config, highcharts_value in self.chart_dict[chart_group][plotname][line_name].items():
+                    for highcharts_config, highcharts_value in line_section.items():
                         output[chart_group][plotname]["series"][line_name][highcharts_config] = highcharts_value
                     
                     # Override any highcharts series configs with standardized data, then generate the data output
@@ -1123,7 +1549,7 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
                     try:
                         obs_group = weewx.units.obs_group_dict[rounding_obs_lookup]
                         obs_unit = self.converter.group_unit_dict[obs_group]
-                        obs_round = self.skin_dict['Units']['StringFormats'].get(obs_unit, "0")[2]
+                        obs_round = string_formats.get(obs_unit, "0")[2]
                         output[chart_group][plotname]["series"][line_name]["rounding"] = obs_round
                     except:
                         # Not a valid weewx schema name - maybe this is windRose or something?
@@ -1148,16 +1574,76 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
                     output[chart_group][plotname]["series"][line_name] = self._highchartsSeriesOptionsToInt(output[chart_group][plotname]["series"][line_name])
             
             # This consolidates all chart_groups into the chart_group JSON (day.json, week.json, month.json, year.json) and saves them to HTML_ROOT/json
-            html_dest_dir = os.path.join(self.config_dict['WEEWX_ROOT'],
-                                     self.skin_dict['HTML_ROOT'],
-                                     "json")
             json_filename = html_dest_dir + "/" + chart_group + ".json"
-            with open(json_filename, mode='w') as jf:
-                jf.write( json.dumps( output[chart_group] ) )
-            # Save the graphs.conf to a json file for future debugging
-            chart_json_filename = html_dest_dir + "/graphs.json"
-            with open(chart_json_filename, mode='w') as cjf:
-                cjf.write( json.dumps( self.chart_dict ) )
+            _atomic_write( json_filename, _json_dumps_bytes( output[chart_group] ) )
+        
+        # Save the graphs.conf to a json file for future debugging. The
+        # dump only depends on graphs.conf, so skip it unless the config
+        # changed since the last one was written.
+        chart_json_filename = html_dest_dir + "/graphs.json"
+        try:
+            graphs_json_stale = os.path.getmtime( chart_json_filename ) < chart_config_mtime
+        except OSError:
+            graphs_json_stale = True
+        if graphs_json_stale:
+            _atomic_write( chart_json_filename, _json_dumps_bytes( self.chart_dict ) )
+
+    def _get_sql_vectors(self, obs_lookup, start_ts, end_ts, aggregate_type, aggregate_interval):
+        """getSqlVectors with a per-run cache. Charts frequently reuse the same
+        observation over the same span (windRose reads windDir and windSpeed,
+        and series repeat across chart groups), so identical queries are
+        answered from memory instead of another SQL round-trip."""
+        key = ( obs_lookup, start_ts, end_ts, aggregate_type, aggregate_interval )
+        hit = self._vector_cache.get( key )
+        if hit is None:
+            hit = self._vector_cache[key] = self.db_lookup().getSqlVectors( TimeSpan( start_ts, end_ts ), obs_lookup, aggregate_type, aggregate_interval )
+        return hit
+
+    def _resolve_timespan(self, time_length, time_ago, day_specific, month_specific, year_specific, plotgen_ts):
+        """Resolve a chart's timespan options to (time_length, minstamp, maxstamp).
+        time_length is returned as well since rolling timespans normalize it to an int."""
+        if time_length == "today":
+            minstamp, maxstamp = archiveDaySpan( self.timespan.stop )
+        elif time_length == "week":
+            week_start = to_int(self.config_dict["Station"].get('week_start', 6))              
+            minstamp, maxstamp = archiveWeekSpan( self.timespan.stop, week_start )
+        elif time_length == "month":
+            minstamp, maxstamp = archiveMonthSpan( self.timespan.stop )
+        elif time_length == "year":
+            minstamp, maxstamp = archiveYearSpan( self.timespan.stop )
+        elif time_length == "days_ago":
+            minstamp, maxstamp = archiveDaySpan( self.timespan.stop, days_ago=time_ago )
+        elif time_length == "weeks_ago":
+            week_start = to_int(self.config_dict["Station"].get('week_start', 6))              
+            minstamp, maxstamp = archiveWeekSpan( self.timespan.stop, week_start, weeks_ago=time_ago )
+        elif time_length == "months_ago":
+            minstamp, maxstamp = archiveMonthSpan( self.timespan.stop, months_ago=time_ago )
+        elif time_length == "years_ago":
+            minstamp, maxstamp = archiveYearSpan( self.timespan.stop, years_ago=time_ago )
+        elif time_length == "day_specific":
+            # Set an arbitrary hour within the specific day to get that full day timespan and not the day before. e.g. 1pm
+            day_dt = datetime.datetime.strptime(str(year_specific) + '-' + str(month_specific) + '-' + str(day_specific) + ' 13', '%Y-%m-%d %H')
+            daystamp = int(time.mktime(day_dt.timetuple()))
+            minstamp, maxstamp = archiveDaySpan( daystamp )
+        elif time_length == "month_specific":
+            # Set an arbitrary day within the specific month to get that full month timespan and not the day before. e.g. 5th day
+            month_dt = datetime.datetime.strptime(str(year_specific) + '-' + str(month_specific) + '-5', '%Y-%m-%d')
+            monthstamp = int(time.mktime(month_dt.timetuple()))
+            minstamp, maxstamp = archiveMonthSpan( monthstamp )
+        elif time_length == "year_specific":
+            # Get a date in the middle of the year to get the full year epoch so weewx can find the year timespan. 
+            year_dt = datetime.datetime.strptime(str(year_specific) + '-8-1', '%Y-%m-%d')
+            yearstamp = int(time.mktime(year_dt.timetuple()))
+            minstamp, maxstamp = archiveYearSpan( yearstamp )
+        elif time_length == "all":
+            minstamp = self.start_ts
+            maxstamp = self.stop_ts
+        else:
+            # Rolling timespans using seconds
+            time_length = int(time_length) # Convert to int() for minstamp math and for point_timestamp conditional later
+            minstamp = plotgen_ts - time_length # Take the generation time and subtract the time_length to get our start time
+            maxstamp = plotgen_ts
+        return ( time_length, minstamp, maxstamp )
 
     def _getObservationData(self, observation, start_ts, end_ts, aggregate_type, aggregate_interval, time_length, xaxis_groupby, xaxis_categories, mirrored_value):
         """Get the SQL vectors for the observation, the aggregate type and the interval of time"""
@@ -1176,19 +1662,24 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
             
             # Get windDir observations.
             obs_lookup = "windDir"
-            (time_start_vt, time_stop_vt, windDir_vt) = self.db_lookup().getSqlVectors(TimeSpan(start_ts, end_ts), obs_lookup, aggregate_type, aggregate_interval)
+            (time_start_vt, time_stop_vt, windDir_vt) = self._get_sql_vectors(obs_lookup, start_ts, end_ts, aggregate_type, aggregate_interval)
             #windDir_vt = self.converter.convert(windDir_vt)
             #usageRound = int(self.skin_dict['Units']['StringFormats'].get(windDir_vt[2], "0f")[-2])
             usageRound = 0 # Force round to 0 decimal
-            windDirRound_vt = [self._roundNone(x, usageRound) for x in windDir_vt[0]]
+            windDirRound_vt = _round_none_list( windDir_vt[0], usageRound )
             #windDirRound_vt = [0.0 if v is None else v for v in windDirRound_vt]
 
             # Get windSpeed observations.
             obs_lookup = "windSpeed"
-            (time_start_vt, time_stop_vt, windSpeed_vt) = self.db_lookup().getSqlVectors(TimeSpan(start_ts, end_ts), obs_lookup, aggregate_type, aggregate_interval)
-            windSpeed_vt = self.converter.convert(windSpeed_vt)
+            (time_start_vt, time_stop_vt, windSpeed_vt) = self._get_sql_vectors(obs_lookup, start_ts, end_ts, aggregate_type, aggregate_interval)
+            # Convert the speed vector with a cached conversion function
+            # rather than the full Converter.convert machinery per chart
+            target_speed_unit = self.converter.group_unit_dict.get( windSpeed_vt[2], windSpeed_vt[1] )
+            if target_speed_unit != windSpeed_vt[1]:
+                conv_func = _get_conv_func( windSpeed_vt[1], target_speed_unit )
+                windSpeed_vt = weewx.units.ValueTuple( [ conv_func(v) if v is not None else None for v in windSpeed_vt[0] ], target_speed_unit, windSpeed_vt[2] )
             usageRound = int(self.skin_dict['Units']['StringFormats'].get(windSpeed_vt[2], "2f")[-2])
-            windSpeedRound_vt = [self._roundNone(x, usageRound) for x in windSpeed_vt[0]]
+            windSpeedRound_vt = _round_none_list( windSpeed_vt[0], usageRound )
             
             # Exit if the vectors are None
             if windDir_vt[1] == None or windSpeed_vt[1] == None:
@@ -1201,250 +1692,43 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
             windSpeedUnit = windSpeed_vt[1]
             windSpeedUnitLabel = self.skin_dict["Units"]["Labels"][windSpeedUnit]
 
-            # Merge the two outputs so we have a consistent data set to filter on
-            merged = zip(windDirRound_vt, windSpeedRound_vt)
-            
-            # Sort by beaufort wind speeds
-            group_0_windDir, group_0_windSpeed, group_1_windDir, group_1_windSpeed, group_2_windDir, group_2_windSpeed, group_3_windDir, group_3_windSpeed, group_4_windDir, group_4_windSpeed, group_5_windDir, group_5_windSpeed, group_6_windDir, group_6_windSpeed = ([] for i in range(14))
-            for windData in merged:
-                if windSpeedUnit == "mile_per_hour" or windSpeedUnit == "mile_per_hour2":
-                    if windData[1] < 1:
-                        group_0_windDir.append( windData[0] )
-                        group_0_windSpeed.append( windData[1] )
-                    elif windData[1] >= 1 and windData[1] <= 3:
-                        group_1_windDir.append( windData[0] )
-                        group_1_windSpeed.append( windData[1] )
-                    elif windData[1] >= 4 and windData[1] <= 7:
-                        group_2_windDir.append( windData[0] )
-                        group_2_windSpeed.append( windData[1] )
-                    elif windData[1] >= 8 and windData[1] <= 12:
-                        group_3_windDir.append( windData[0] )
-                        group_3_windSpeed.append( windData[1] )
-                    elif windData[1] >= 13 and windData[1] <= 18:
-                        group_4_windDir.append( windData[0] )
-                        group_4_windSpeed.append( windData[1] )
-                    elif windData[1] >= 19 and windData[1] <= 24:
-                        group_5_windDir.append( windData[0] )
-                        group_5_windSpeed.append( windData[1] )
-                    elif windData[1] >= 25:
-                        group_6_windDir.append( windData[0] )
-                        group_6_windSpeed.append( windData[1] )
-                elif windSpeedUnit == "km_per_hour" or windSpeedUnit == "km_per_hour2":
-                    if windData[1] < 2:
-                        group_0_windDir.append( windData[0] )
-                        group_0_windSpeed.append( windData[1] )
-                    elif windData[1] >= 2 and windData[1] <= 5:
-                        group_1_windDir.append( windData[0] )
-                        group_1_windSpeed.append( windData[1] )
-                    elif windData[1] >= 6 and windData[1] <= 11:
-                        group_2_windDir.append( windData[0] )
-                        group_2_windSpeed.append( windData[1] )
-                    elif windData[1] >= 12 and windData[1] <= 19:
-                        group_3_windDir.append( windData[0] )
-                        group_3_windSpeed.append( windData[1] )
-                    elif windData[1] >= 20 and windData[1] <= 28:
-                        group_4_windDir.append( windData[0] )
-                        group_4_windSpeed.append( windData[1] )
-                    elif windData[1] >= 29 and windData[1] <= 38:
-                        group_5_windDir.append( windData[0] )
-                        group_5_windSpeed.append( windData[1] )
-                    elif windData[1] >= 39:
-                        group_6_windDir.append( windData[0] )
-                        group_6_windSpeed.append( windData[1] )
-                elif windSpeedUnit == "meter_per_second" or windSpeedUnit == "meter_per_second2":
-                    if windData[1] < 0.5:
-                        group_0_windDir.append( windData[0] )
-                        group_0_windSpeed.append( windData[1] )
-                    elif windData[1] >= 0.5 and windData[1] <= 1.5:
-                        group_1_windDir.append( windData[0] )
-                        group_1_windSpeed.append( windData[1] )
-                    elif windData[1] >= 1.6 and windData[1] <= 3.3:
-                        group_2_windDir.append( windData[0] )
-                        group_2_windSpeed.append( windData[1] )
-                    elif windData[1] >= 3.4 and windData[1] <= 5.5:
-                        group_3_windDir.append( windData[0] )
-                        group_3_windSpeed.append( windData[1] )
-                    elif windData[1] >= 5.6 and windData[1] <= 7.9:
-                        group_4_windDir.append( windData[0] )
-                        group_4_windSpeed.append( windData[1] )
-                    elif windData[1] >= 8 and windData[1] <= 10.7:
-                        group_5_windDir.append( windData[0] )
-                        group_5_windSpeed.append( windData[1] )
-                    elif windData[1] >= 10.8:
-                        group_6_windDir.append( windData[0] )
-                        group_6_windSpeed.append( windData[1] )
-                elif windSpeedUnit == "knot" or windSpeedUnit == "knot2":
-                    if windData[1] < 1:
-                        group_0_windDir.append( windData[0] )
-                        group_0_windSpeed.append( windData[1] )
-                    elif windData[1] >= 1 and windData[1] <= 3:
-                        group_1_windDir.append( windData[0] )
-                        group_1_windSpeed.append( windData[1] )
-                    elif windData[1] >= 4 and windData[1] <= 6:
-                        group_2_windDir.append( windData[0] )
-                        group_2_windSpeed.append( windData[1] )
-                    elif windData[1] >= 7 and windData[1] <= 10:
-                        group_3_windDir.append( windData[0] )
-                        group_3_windSpeed.append( windData[1] )
-                    elif windData[1] >= 11 and windData[1] <= 16:
-                        group_4_windDir.append( windData[0] )
-                        group_4_windSpeed.append( windData[1] )
-                    elif windData[1] >= 17 and windData[1] <= 21:
-                        group_5_windDir.append( windData[0] )
-                        group_5_windSpeed.append( windData[1] )
-                    elif windData[1] >= 22:
-                        group_6_windDir.append( windData[0] )
-                        group_6_windSpeed.append( windData[1] )
-
+            # Sort by beaufort wind speeds, iterating the two vectors in
+            # lockstep without materializing a merged list of tuples. The
+            # interval bounds and legend ranges are tabled per unit in
+            # _WINDROSE_SPEC.
+            group_windDir = [ [] for i in range(7) ]
+            group_windSpeed = [ [] for i in range(7) ]
+            bins, speed_ranges = _WINDROSE_SPEC.get( windSpeedUnit.rstrip("2"), ( None, ( "", ) * 7 ) )
+            if bins is not None:
+                bisect_right = bisect.bisect_right
+                for windDir, windSpeed in izip(windDirRound_vt, windSpeedRound_vt):
+                    group = bisect_right( bins, windSpeed )
+                    group_windDir[group].append( windDir )
+                    group_windSpeed[group].append( windSpeed )
             # Get the windRose data
-            group_0_series_data = self._create_windRose_data( group_0_windDir, group_0_windSpeed )
-            group_1_series_data = self._create_windRose_data( group_1_windDir, group_1_windSpeed )
-            group_2_series_data = self._create_windRose_data( group_2_windDir, group_2_windSpeed )
-            group_3_series_data = self._create_windRose_data( group_3_windDir, group_3_windSpeed )
-            group_4_series_data = self._create_windRose_data( group_4_windDir, group_4_windSpeed )
-            group_5_series_data = self._create_windRose_data( group_5_windDir, group_5_windSpeed )
-            group_6_series_data = self._create_windRose_data( group_6_windDir, group_6_windSpeed )
+            group_series_data = [ self._create_windRose_data( d, s ) for d, s in zip( group_windDir, group_windSpeed ) ]
             
             # Group all together to get wind frequency percentages
-            wind_sum = sum(group_0_series_data + group_1_series_data + group_2_series_data + group_3_series_data + group_4_series_data + group_5_series_data + group_6_series_data)
+            wind_sum = sum( sum( group ) for group in group_series_data )
             if wind_sum > 0:
-                y = 0
-                while y < len(group_0_series_data):
-                    group_0_series_data[y] = round(group_0_series_data[y] / wind_sum * 100)
-                    y += 1
-                y = 0
-                while y < len(group_1_series_data):
-                    group_1_series_data[y] = round(group_1_series_data[y] / wind_sum * 100)
-                    y += 1
-                y = 0
-                while y < len(group_2_series_data):
-                    group_2_series_data[y] = round(group_2_series_data[y] / wind_sum * 100)
-                    y += 1
-                y = 0
-                while y < len(group_3_series_data):
-                    group_3_series_data[y] = round(group_3_series_data[y] / wind_sum * 100)
-                    y += 1
-                y = 0
-                while y < len(group_4_series_data):
-                    group_4_series_data[y] = round(group_4_series_data[y] / wind_sum * 100)
-                    y += 1
-                y = 0
-                while y < len(group_5_series_data):
-                    group_5_series_data[y] = round(group_5_series_data[y] / wind_sum * 100)
-                    y += 1
-                y = 0
-                while y < len(group_6_series_data):
-                    group_6_series_data[y] = round(group_6_series_data[y] / wind_sum * 100)
-                    y += 1
-            
-            # Setup the labels based on unit
-            if windSpeedUnit == "mile_per_hour" or windSpeedUnit == "mile_per_hour2":
-                group_0_speedRange = "< 1"
-                group_1_speedRange = "1-3"
-                group_2_speedRange = "4-7"
-                group_3_speedRange = "8-12"
-                group_4_speedRange = "13-18"
-                group_5_speedRange = "19-24"
-                group_6_speedRange = "25+"
-            elif windSpeedUnit == "km_per_hour" or windSpeedUnit == "km_per_hour2":
-                group_0_speedRange = "< 2"
-                group_1_speedRange = "2-5"
-                group_2_speedRange = "6-11"
-                group_3_speedRange = "12-19"
-                group_4_speedRange = "20-28"
-                group_5_speedRange = "29-38"
-                group_6_speedRange = "39+"
-            elif windSpeedUnit == "meter_per_second" or windSpeedUnit == "meter_per_second2":
-                group_0_speedRange = "< 0.5"
-                group_1_speedRange = "0.5-1.5"
-                group_2_speedRange = "1.6-3.3"
-                group_3_speedRange = "3.4-5.5"
-                group_4_speedRange = "5.5-7.9"
-                group_5_speedRange = "8-10.7"
-                group_6_speedRange = "10.8+"
-            elif windSpeedUnit == "knot" or windSpeedUnit == "knot2":
-                group_0_speedRange = "< 1"
-                group_1_speedRange = "1-3"
-                group_2_speedRange = "4-6"
-                group_3_speedRange = "7-10"
-                group_4_speedRange = "11-16"
-                group_5_speedRange = "17-21"
-                group_6_speedRange = "22+"
+                # Multiply by the reciprocal once instead of dividing per value
+                scale = 100.0 / wind_sum
+                for group in group_series_data:
+                    for y in range( len( group ) ):
+                        group[y] = round( group[y] * scale )
             
-            group_0_name = "%s %s" % (group_0_speedRange, windSpeedUnitLabel)
-            group_1_name = "%s %s" % (group_1_speedRange, windSpeedUnitLabel)
-            group_2_name = "%s %s" % (group_2_speedRange, windSpeedUnitLabel)
-            group_3_name = "%s %s" % (group_3_speedRange, windSpeedUnitLabel)
-            group_4_name = "%s %s" % (group_4_speedRange, windSpeedUnitLabel)
-            group_5_name = "%s %s" % (group_5_speedRange, windSpeedUnitLabel)
-            group_6_name = "%s %s" % (group_6_speedRange, windSpeedUnitLabel)
-                                        
-            group_0 = { "name": group_0_name,            
-                        "type": "column",
-                        "_colorIndex": 0,
-                        "zIndex": 106, 
-                        "stacking": "normal", 
-                        "fillOpacity": 0.75, 
-                        "data": group_0_series_data
-                      }
-            group_1 = { "name": group_1_name,            
-                        "type": "column",
-                        "_colorIndex": 1,
-                        "zIndex": 105, 
-                        "stacking": "normal", 
-                        "fillOpacity": 0.75, 
-                        "data": group_1_series_data
-                      }
-            group_2 = { "name": group_2_name,            
-                        "type": "column",
-                        "_colorIndex": 2,
-                        "zIndex": 104,
-                        "stacking": "normal", 
-                        "fillOpacity": 0.75, 
-                        "data": group_2_series_data
-                      }
-            group_3 = { "name": group_3_name,            
-                        "type": "column",
-                        "_colorIndex": 3,
-                        "zIndex": 103, 
-                        "stacking": "normal", 
-                        "fillOpacity": 0.75, 
-                        "data": group_3_series_data
-                      }
-            group_4 = { "name": group_4_name,            
-                        "type": "column",
-                        "_colorIndex": 4,
-                        "zIndex": 102, 
-                        "stacking": "normal", 
-                        "fillOpacity": 0.75, 
-                        "data": group_4_series_data
-                      }
-            group_5 = { "name": group_5_name,            
-                        "type": "column",
-                        "_colorIndex": 5,
-                        "zIndex": 101, 
-                        "stacking": "normal", 
-                        "fillOpacity": 0.75, 
-                        "data": group_5_series_data
-                      }
-            group_6 = { "name": group_6_name,            
-                        "type": "column",
-                        "_colorIndex": 6,
-                        "zIndex": 100, 
-                        "stacking": "normal", 
-                        "fillOpacity": 0.75, 
-                        "data": group_6_series_data
-                      }
-            
-            # Append everything into a list and return right away, do not process rest of function
+            # Build the legend names and the seven series dicts from the spec
             series = []
-            series.append(group_0)
-            series.append(group_1)
-            series.append(group_2)
-            series.append(group_3)
-            series.append(group_4)
-            series.append(group_5)
-            series.append(group_6)
+            for group, group_data in enumerate( group_series_data ):
+                series.append( { "name": "%s %s" % ( speed_ranges[group], windSpeedUnitLabel ),
+                                 "type": "column",
+                                 "_colorIndex": group,
+                                 "zIndex": 106 - group,
+                                 "stacking": "normal",
+                                 "fillOpacity": 0.75,
+                                 "data": group_data
+                               } )
+            # Return right away, do not process rest of function
             return series
         
         # Special Belchertown Skin rain counter
@@ -1463,20 +1747,24 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
         
         if ( xaxis_groupby or len(xaxis_categories) >= 1 ):
             # Setup the converter - for some reason self.converter doesn't work for the group_unit_dict in this section
-            # Get the target unit nickname (something like 'US' or 'METRIC'):
-            target_unit_nickname = self.config_dict['StdConvert']['target_unit']
-            # Get the target unit: weewx.US, weewx.METRIC, weewx.METRICWX
-            target_unit = weewx.units.unit_constants[target_unit_nickname.upper()]
-            # Bind to the appropriate standard converter units
-            converter = weewx.units.StdUnitConverters[target_unit]
-            
-            # Find what kind of database we're working with and specify the correctly tailored SQL Query for each type of database
-            dataBinding = self.config_dict['StdArchive']['data_binding']
-            database = self.config_dict['DataBindings'][dataBinding]['database']
-            databaseType = self.config_dict['Databases'][database]['database_type']
-            driver = self.config_dict['DatabaseTypes'][databaseType]['driver']
-            xaxis_labels = []
-            obsvalues = []
+            # The target unit and database driver come from the config, which
+            # can't change mid-render, so resolve them once per run instead of
+            # once per series.
+            if self._groupby_ctx is None:
+                # Get the target unit nickname (something like 'US' or 'METRIC'):
+                target_unit_nickname = self.config_dict['StdConvert']['target_unit']
+                # Get the target unit: weewx.US, weewx.METRIC, weewx.METRICWX
+                target_unit = weewx.units.unit_constants[target_unit_nickname.upper()]
+                # Bind to the appropriate standard converter units
+                converter = weewx.units.StdUnitConverters[target_unit]
+                
+                # Find what kind of database we're working with and specify the correctly tailored SQL Query for each type of database
+                dataBinding = self.config_dict['StdArchive']['data_binding']
+                database = self.config_dict['DataBindings'][dataBinding]['database']
+                databaseType = self.config_dict['Databases'][database]['database_type']
+                driver = self.config_dict['DatabaseTypes'][databaseType]['driver']
+                self._groupby_ctx = ( converter, driver )
+            converter, driver = self._groupby_ctx
             
             # Define the xaxis group by for the sql query. Default to month
             if xaxis_groupby == "month":
@@ -1492,32 +1780,49 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
             if aggregate_type is None:
                 aggregate_type = "sum"
                 
+            # The timespan and the time format are bound as parameters so the
+            # SQL text stays identical between calls and the database can
+            # reuse its prepared plan. Only identifiers (the alias, aggregate
+            # and column, all from fixed internal sets) are interpolated.
             if driver == "weedb.sqlite":
-                sql_lookup = 'SELECT strftime("{0}", datetime(dateTime, "unixepoch")) as {1}, IFNULL({2}({3}),0) as obs FROM archive WHERE dateTime >= {4} AND dateTime <= {5} GROUP BY {6};'.format( strformat, xaxis_groupby, aggregate_type, obs_lookup, start_ts, end_ts, xaxis_groupby )
+                sql_lookup = 'SELECT strftime(?, datetime(dateTime, "unixepoch")) as {0}, IFNULL({1}({2}),0) as obs FROM archive WHERE dateTime >= ? AND dateTime <= ? GROUP BY {0};'.format( xaxis_groupby, aggregate_type, obs_lookup )
+                sql_params = ( strformat, start_ts, end_ts )
             elif driver == "weedb.mysql":
-                sql_lookup = 'SELECT FROM_UNIXTIME( dateTime, "%{0}" ) AS {1}, IFNULL({2}({3}),0) as obs FROM archive WHERE dateTime >= {4} AND dateTime <= {5} GROUP BY {6};'.format( strformat, xaxis_groupby, aggregate_type, obs_lookup, start_ts, end_ts, xaxis_groupby )
+                sql_lookup = 'SELECT FROM_UNIXTIME( dateTime, ? ) AS {0}, IFNULL({1}({2}),0) as obs FROM archive WHERE dateTime >= ? AND dateTime <= ? GROUP BY {0};'.format( xaxis_groupby, aggregate_type, obs_lookup )
+                sql_params = ( "%" + strformat, start_ts, end_ts )
             
-            # Setup values for the converter
-            try:
-                obs_group = weewx.units.obs_group_dict[obs_lookup]
-                obs_unit_from_target_unit = converter.group_unit_dict[obs_group]
-            except:
-                # This observation doesn't exist within weewx schema so nothing to convert, so set None type
-                obs_group = None
-                obs_unit_from_target_unit = None
+            # Setup values for the converter, memoized per observation for
+            # the run
+            conv_ctx = self._conv_ctx_cache.get( obs_lookup )
+            if conv_ctx is None:
+                try:
+                    obs_group = weewx.units.obs_group_dict[obs_lookup]
+                    obs_unit_from_target_unit = converter.group_unit_dict[obs_group]
+                except:
+                    # This observation doesn't exist within weewx schema so nothing to convert, so set None type
+                    obs_group = None
+                    obs_unit_from_target_unit = None
+                conv_ctx = self._conv_ctx_cache[obs_lookup] = ( obs_group, obs_unit_from_target_unit )
+            obs_group, obs_unit_from_target_unit = conv_ctx
             
-            query = self.archive.genSql( sql_lookup )
-            for row in query:
-                xaxis_labels.append( row[0] )
-                row_tuple = (row[1], obs_unit_from_target_unit, obs_group)
-                row_converted = self.converter.convert( row_tuple )
-                obsvalues.append( row_converted[0] )
+            # Identical grouped queries repeat when the same series appears
+            # in several chart groups, so answer them from the per-run cache
+            # like the vector lookups above.
+            groupby_key = ( strformat, aggregate_type, obs_lookup, start_ts, end_ts, xaxis_groupby )
+            rows = self._groupby_cache.get( groupby_key )
+            if rows is None:
+                rows = self._groupby_cache[groupby_key] = list( self.archive.genSql( sql_lookup, sql_params ) )
+            # weewx.units.convert maps across iterable values, so one call
+            # converts the whole column instead of one ValueTuple per row. The
+            # label/value split is a single zip transpose rather than two
+            # passes over the rows.
+            xaxis_labels, raw_values = zip( *rows ) if rows else ( (), () )
+            converted_vt = self.converter.convert( ( raw_values, obs_unit_from_target_unit, obs_group ) )
+            obsvalues = list( converted_vt[0] )
 
             # If the values are to be mirrored, we need to make them negative
             if mirrored_value:
-                for i in range(len(obsvalues)):
-                    if obsvalues[i] is not None:
-                        obsvalues[i] = -obsvalues[i]
+                obsvalues = [ -v if v is not None else None for v in obsvalues ]
 
             # Return a dict which has the value for if we need to add labels from sql or not. 
             if len(xaxis_categories) == 0:
@@ -1527,20 +1832,42 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
             return data
         
         # Begin standard observation lookups
-        (time_start_vt, time_stop_vt, obs_vt) = self.db_lookup().getSqlVectors(TimeSpan(start_ts, end_ts), obs_lookup, aggregate_type, aggregate_interval)
+        # Daily aggregates can be answered from the precomputed
+        # archive_day_<obs> table instead of scanning every archive row in the
+        # span - roughly 288x fewer rows at a 5 minute archive interval.
+        obs_vt = None
+        if aggregate_type and aggregate_interval == 86400 and str(aggregate_type).lower() in _DAY_AGG_COLS:
+            try:
+                daily_sql = 'SELECT dateTime, %s FROM archive_day_%s WHERE dateTime >= ? AND dateTime < ? ORDER BY dateTime ASC;' % ( _DAY_AGG_COLS[str(aggregate_type).lower()], obs_lookup )
+                day_start_list = []
+                day_obs_list = []
+                for row in self.archive.genSql( daily_sql, ( start_ts, end_ts ) ):
+                    day_start_list.append( row[0] )
+                    day_obs_list.append( row[1] )
+                ( day_obs_unit, day_obs_group ) = weewx.units.getStandardUnitType( self.archive.std_unit_system, obs_lookup, aggregate_type )
+                time_start_vt = weewx.units.ValueTuple( day_start_list, "unix_epoch", "group_time" )
+                time_stop_vt = weewx.units.ValueTuple( [ day_ts + 86400 for day_ts in day_start_list ], "unix_epoch", "group_time" )
+                obs_vt = weewx.units.ValueTuple( day_obs_list, day_obs_unit, day_obs_group )
+            except weedb.DatabaseError:
+                # No daily summary table for this observation, scan the archive instead
+                obs_vt = None
+        if obs_vt is None:
+            (time_start_vt, time_stop_vt, obs_vt) = self._get_sql_vectors(obs_lookup, start_ts, end_ts, aggregate_type, aggregate_interval)
         obs_vt = self.converter.convert(obs_vt)
                 
         # Special handling for the rain.
         if observation == "rainTotal":
             # The weewx "rain" observation is really "bucket tips". This special counter increments the bucket tips over timespan to return rain total.
-            rain_count = 0
+            # One tight pass: None, "" and 0.0 all leave the running total
+            # unchanged, and the bound append avoids an attribute lookup per
+            # archive row.
+            rain_count = 0.0
             obsRound_vt = []
+            append = obsRound_vt.append
             for rain in obs_vt[0]:
-                # If the rain value is None or "", add it as 0.0
-                if rain is None or rain == "":
-                    rain = 0.0
-                rain_count = rain_count + rain
-                obsRound_vt.append( round( rain_count, 2 ) )
+                if rain:
+                    rain_count += rain
+                append( round( rain_count, 2 ) )
         else:
             # Send all other observations through the usual process, except Barometer for finer detail
             if observation == "barometer":
@@ -1548,7 +1875,7 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
                 obsRound_vt = [round(x,usageRound) if x is not None else None for x in obs_vt[0]]
             else:
                 usageRound = int(self.skin_dict['Units']['StringFormats'].get(obs_vt[2], "2f")[-2])
-                obsRound_vt = [self._roundNone(x, usageRound) for x in obs_vt[0]]
+                obsRound_vt = _round_none_list( obs_vt[0], usageRound )
             
         # "Today" charts and floating timespan charts have the point timestamp on the stop time so we don't see the 
         # previous minute in the tooltip. (e.g. 4:59 instead of 5:00)
@@ -1560,99 +1887,51 @@ class HighchartsJsonGenerator(weewx.reportengine.ReportGenerator):
         
         # If the values are to be mirrored, we need to make them negative
         if mirrored_value:
-            for i in range(len(obsRound_vt)):
-                if obsRound_vt[i] is not None:
-                    obsRound_vt[i] = -obsRound_vt[i]
+            obsRound_vt = [ -v if v is not None else None for v in obsRound_vt ]
                 
-        time_ms = [float(x) * 1000 for x in point_timestamp[0]]
-        data = zip(time_ms, obsRound_vt)
-        
-        return data
+        # Highcharts wants [timestamp_ms, value] pairs. Build them in a single
+        # pass rather than materializing a full millisecond list first.
+        return [ [ float(x) * 1000, v ] for x, v in izip( point_timestamp[0], obsRound_vt ) ]
         
-    def _roundNone(self, value, places):
-        """Round value to 'places' places but also permit a value of None"""
-        if value is not None:
-            try:
-                value = round(value, places)
-            except Exception, e:
-                value = None
-        return value
-
     def _create_windRose_data(self, windDirList, windSpeedList):
         # List comprehension borrowed from weewx-wd extension
         # Create windroseList container and initialise to all 0s
-        windroseList=[0.0 for x in range(16)]
+        windroseList = [0.0] * 16
         
         # Step through each windDir and add corresponding windSpeed to windroseList
-        x = 0
-        while x < len(windDirList):
+        for windDir, windSpeed in zip(windDirList, windSpeedList):
             # Only want to add windSpeed if both windSpeed and windDir have a value
-            if windSpeedList[x] != None and windDirList[x] != None:
+            if windSpeed is not None and windDir is not None:
                 # Add the windSpeed value to the corresponding element of our windrose list
-                windroseList[int((windDirList[x]+11.25)/22.5)%16] += windSpeedList[x]
-            x += 1
+                windroseList[int((windDir+11.25)/22.5)%16] += windSpeed
             
-        # Step through our windrose list and round all elements to 1 decimal place
-        y = 0
-        while y < len(windroseList):
-            windroseList[y] = round(windroseList[y],1)
-            y += 1
-        # Need to return a string of the list elements comma separated, no spaces and bounded by [ and ]
-        #windroseData = '[' + ','.join(str(z) for z in windroseList) + ']'
-        return windroseList
+        # Round all elements to 1 decimal place
+        return [round(sector_sum, 1) for sector_sum in windroseList]
 
     def _get_cardinal_direction(self, degree):
-        if (degree >= 0 and degree <= 11.25):
-            return "N"
-        elif (degree >= 11.26 and degree <= 33.75):
-            return "NNE"
-        elif (degree >= 33.76 and degree <= 56.25):
-            return "NE"
-        elif (degree >= 56.26 and degree <= 78.75):
-            return "ENE"
-        elif (degree >= 78.76 and degree <= 101.25):
-            return "E"
-        elif (degree >= 101.26 and degree <= 123.75):
-            return "ESE"
-        elif (degree >= 123.76 and degree <= 146.25):
-            return "SE"
-        elif (degree >= 146.26 and degree <= 168.75):
-            return "SSE"
-        elif (degree >= 168.76 and degree <= 191.25):
-            return "S"
-        elif (degree >= 191.26 and degree <= 213.75):
-            return "SSW"
-        elif (degree >= 213.76 and degree <= 236.25):
-            return "SW"
-        elif (degree >= 236.26 and degree <= 258.75):
-            return "WSW"
-        elif (degree >= 258.76 and degree <= 281.25):
-            return "W"
-        elif (degree >= 281.26 and degree <= 303.75):
-            return "WNW"
-        elif (degree >= 303.76 and degree <= 326.25):
-            return "NW"
-        elif (degree >= 326.26 and degree <= 348.75):
-            return "NNW"
-        elif (degree >= 348.76 and degree <= 360):
-            return "N"
+        # One arithmetic sector index into the compass table instead of 17
+        # range comparisons. The modulo also covers values the old branches
+        # missed, like 11.255 or anything over 360.
+        return _CARDINAL[ int( ( degree % 360 ) / 22.5 + 0.5 ) % 16 ]
     
     def _highchartsSeriesOptionsToInt(self, d):
-        # Recurse through all the series options and set any strings that should be integers back to integers. 
-        # https://stackoverflow.com/a/54565277/1177153
-        try:
-            for k, v in d.items():
-                if isinstance(v, dict):
-                    # Check nested dicts
-                    self._highchartsSeriesOptionsToInt(v)
-                else:
-                    try:
-                        v = to_int(v)
-                        d.update({k: v})
-                    except:
-                        pass
-            return d
-        except:
+        # Walk all the series options and set any strings that should be integers back to integers. 
+        # Values that can't be coerced are checked up front instead of letting
+        # to_int raise on every non-numeric option, and nested dicts go on an
+        # explicit stack rather than the call stack.
+        if not isinstance(d, dict):
             # This item isn't a dict, so return it back
             return d
+        stack = [ d ]
+        while stack:
+            current = stack.pop()
+            for k, v in current.items():
+                if isinstance(v, dict):
+                    stack.append( v )
+                elif isinstance(v, _STR_TYPES):
+                    if v.lstrip("-").isdigit():
+                        current[k] = int(v)
+                    elif v.lower() == "none":
+                        current[k] = None
+        return d
 